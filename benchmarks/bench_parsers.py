@@ -0,0 +1,245 @@
+"""
+Offline parser benchmarks
+
+Runs the ITViec, TopCV and LinkedIn parsers against the saved HTML in
+benchmarks/fixtures and reports pages/sec and the memory one page takes, per
+case: the peak Python allocations seen by tracemalloc, and the peak RSS growth
+while parsing, which also counts libxml2's memory.
+
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --json bench.json
+    python benchmarks/bench_parsers.py --baseline bench.json --max-regression 0.2
+    python benchmarks/bench_parsers.py --backend bs4 --backend lxml
+"""
+
+import argparse
+import ctypes
+import gc
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+
+from src.itviec_job_manager import ITViecJobManager
+from src.job import Job
+from src.logger import logger
+from src.parsers import get_parser
+from src.topcv_job_manager import TopCVJobManager
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class FixtureResponse:
+    def __init__(self, text: str):
+        self.status_code = 200
+        self.text = text
+        self.headers = {}
+
+
+class FixtureFetcher:
+    """Stands in for AsyncFetcher and always answers with one fixture page."""
+
+    def __init__(self, text: str):
+        self.response = FixtureResponse(text)
+
+    def fetch(self, url, use_cache=False, max_age=None):
+        return self.response
+
+    def fetch_all(self, urls, use_cache=False, max_age=None):
+        return [self.response for _ in urls]
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def check_job_list(expected_jobs):
+    def check(result):
+        job_list, _ = result
+        assert len(job_list) == expected_jobs, f"{len(job_list)} jobs parsed"
+        for job in job_list:
+            assert job.title and job.company and job.link and job.location, job
+
+    return check
+
+
+def check_description(job: Job):
+    assert job.description and len(job.description) > 500, "description missing"
+
+
+def build_cases(backend: str):
+    itviec = ITViecJobManager(None)
+    itviec.parser = get_parser(backend)
+    itviec.fetcher = FixtureFetcher(read_fixture("itviec_listing.html"))
+    itviec_listing = read_fixture("itviec_listing.html")
+    itviec_detail = FixtureResponse(read_fixture("itviec_detail.html"))
+
+    topcv = TopCVJobManager(None)
+    topcv.parser = get_parser(backend)
+    topcv.fetcher = FixtureFetcher(read_fixture("topcv_listing.html"))
+    topcv_listing = read_fixture("topcv_listing.html")
+    topcv_detail = FixtureResponse(read_fixture("topcv_detail.html"))
+
+    linkedin = get_parser(backend)
+    linkedin_posting = read_fixture("linkedin_job_posting.html")
+
+    def itviec_description():
+        job = Job()
+        itviec._parse_job_description(job, itviec_detail)
+        return job
+
+    def topcv_detail_page():
+        job = Job()
+        topcv._parse_job_description(job, topcv_detail)
+        return job
+
+    def check_topcv_detail(job: Job):
+        check_description(job)
+        assert job.title and job.company and job.location, job
+
+    def check_linkedin(description):
+        assert description and len(description) > 500, "description missing"
+
+    return {
+        "itviec.read_jobs": (
+            lambda: itviec.read_jobs("https://itviec.com/it-jobs/ai?page=2"),
+            check_job_list(20),
+        ),
+        "itviec.card_extraction": (
+            lambda: itviec.parse_job_list(itviec_listing),
+            check_job_list(20),
+        ),
+        "itviec.job_description": (itviec_description, check_description),
+        "topcv.read_jobs": (
+            lambda: topcv.read_jobs("https://www.topcv.vn/tim-viec-lam-ai?page=2"),
+            check_job_list(25),
+        ),
+        "topcv.job_list": (
+            lambda: topcv.parse_job_list(topcv_listing),
+            check_job_list(25),
+        ),
+        "topcv.handle_regular_job": (topcv_detail_page, check_topcv_detail),
+        "linkedin.job_description": (
+            lambda: linkedin.linkedin_job_description(linkedin_posting),
+            check_linkedin,
+        ),
+    }
+
+
+def _proc_status_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def rss_growth_kb(func) -> Optional[int]:
+    """Peak RSS growth while running func, None off Linux/glibc.
+
+    Unlike tracemalloc this also counts the C allocations of libxml2.
+    """
+    try:
+        libc = ctypes.CDLL("libc.so.6")
+        gc.collect()
+        # Hand freed heap back to the OS, or the case could reuse it unseen
+        libc.malloc_trim(0)
+        # Resets the peak RSS (VmHWM) to the current RSS
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        before = _proc_status_kb("VmRSS")
+    except (OSError, AttributeError, KeyError):
+        return None
+    func()
+    return _proc_status_kb("VmHWM") - before
+
+
+def run_case(func, check, iterations: int) -> dict:
+    check(func())
+
+    rss_growth = rss_growth_kb(func)
+
+    tracemalloc.start()
+    func()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return {
+        "pages_per_sec": iterations / elapsed,
+        "ms_per_page": elapsed * 1000 / iterations,
+        "alloc_peak_kb": alloc_peak / 1024,
+        "rss_growth_kb": rss_growth,
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["pages_per_sec"]
+        after = result["pages_per_sec"]
+        if after < before * (1 - max_regression):
+            regressions.append(f"{name}: {before:.1f} -> {after:.1f} pages/sec")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--filter", default="", help="Only run cases containing this")
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=["bs4", "lxml"],
+        help="Parser backend to benchmark, can be repeated (default: lxml)",
+    )
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    results = {}
+    print(
+        f"{'case':40} {'pages/s':>10} {'ms/page':>10} {'alloc KiB':>10} {'RSS KiB':>9}"
+    )
+    for backend in args.backend or ["lxml"]:
+        for name, (func, check) in build_cases(backend).items():
+            name = f"{backend}:{name}"
+            if args.filter not in name:
+                continue
+            result = run_case(func, check, args.iterations)
+            results[name] = result
+            rss = result["rss_growth_kb"]
+            print(
+                f"{name:40} {result['pages_per_sec']:10.1f} "
+                f"{result['ms_per_page']:10.2f} {result['alloc_peak_kb']:10.0f} "
+                f"{rss if rss is not None else 'n/a':>9}"
+            )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=4))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
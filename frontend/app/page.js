@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import JobCard from "../components/JobCard";
 import JobSourceFilter from "../components/JobSourceFilter";
 import LocationFilter from "../components/LocationFilter";
@@ -16,6 +16,8 @@ export default function JobBoard() {
   const [search, setSearch] = useState("");
   const [page, setPage] = useState(1);
   const [total, setTotal] = useState(0);
+  // next_cursor of every page fetched so far, keyed by the page it leads to
+  const cursors = useRef({});
   const [favorites, setFavorites] = useState([]);
   const [showFavorites, setShowFavorites] = useState(false);
   const [perPage, setPerPage] = useState(() => {
@@ -90,12 +92,19 @@ export default function JobBoard() {
     fetchFavorites();
   }, [apiBase]);
 
+  // Cursors only hold for the filters they were issued for
+  useEffect(() => {
+    cursors.current = {};
+  }, [selectedSource, search, showFavorites, perPage, selectedLocations]);
+
   // Fetch jobs with location filter
   useEffect(() => {
     async function fetchJobs() {
       try {
         const params = new URLSearchParams();
         params.append("page", page);
+        // Pages reached by next/previous continue from a cursor; jumps use the offset
+        if (cursors.current[page]) params.append("cursor", cursors.current[page]);
         params.append("per_page", perPage);
         if (selectedSource) params.append("source", selectedSource);
         if (search) params.append("search", search);
@@ -108,6 +117,7 @@ export default function JobBoard() {
         const data = await res.json();
         setJobs(data.jobs);
         setTotal(data.total);
+        if (data.next_cursor) cursors.current[page + 1] = data.next_cursor;
         if (data.jobs.length > 0) {
           setSelectedJob(data.jobs[0]);
         } else {
@@ -184,7 +194,7 @@ export default function JobBoard() {
 
     setIsTranslating(true);
     try {
-      const response = await fetch(`${apiBase}/translate`, {
+      const response = await fetch(`${apiBase}/translate/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -195,19 +205,41 @@ export default function JobBoard() {
         }),
       });
 
-      if (!response.ok) {
+      const contentType = response.headers.get('Content-Type') || '';
+      if (!response.ok || !contentType.includes('text/event-stream')) {
         throw new Error('Translation failed');
       }
 
-      const data = await response.json();
-      setTranslations(prev => ({
-        ...prev,
-        [jobId]: data.translated_text
-      }));
-      setTranslationStates(prev => ({
-        ...prev,
-        [jobId]: true
-      }));
+      // Server-sent events: show the text as it arrives
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let translated = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const event of events) {
+          const eventType = event.match(/^event: (.*)$/m)?.[1];
+          const dataLine = event.match(/^data: (.*)$/m)?.[1];
+          if (!dataLine) continue;
+          const data = JSON.parse(dataLine);
+          if (eventType === 'error') {
+            throw new Error(data.error);
+          }
+          translated = eventType === 'done' ? data.translated_text : translated + data.text;
+          setTranslations(prev => ({
+            ...prev,
+            [jobId]: translated
+          }));
+          setTranslationStates(prev => ({
+            ...prev,
+            [jobId]: true
+          }));
+        }
+      }
     } catch (error) {
       console.error('Translation error:', error);
     } finally {
@@ -1,6 +1,9 @@
 import re
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, List
 
 import cloudscraper
 import schedule
@@ -10,23 +13,105 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 from src.authenticator import LinkedInAuthenticator
 from src.config_validator import ConfigValidator
+from src.driver_pool import DriverPool
 from src.itviec_job_manager import ITViecJobManager
 from src.job_manager import JobManager
 from src.logger import logger
+from src.models import Session
 from src.topcv_job_manager import TopCVJobManager
 from src.utils import chrome_browser_options
 
 
-def init_browser() -> webdriver.Chrome:
+def init_browser(user_data_dir="Default") -> webdriver.Chrome:
     try:
-        options = chrome_browser_options()
+        options = chrome_browser_options(user_data_dir)
         service = ChromeService(ChromeDriverManager().install())
         return webdriver.Chrome(service=service, options=options)
     except Exception as e:
         raise RuntimeError(f"Failed to initialize chrome browser: {e}")
 
 
-def run_job_crawler():
+def crawl_linkedin(parameters: Dict, secrets: Dict, db) -> int:
+    # Init browser
+    browser = init_browser()
+    # Every driver created so far, so they're all quit even if a later one fails
+    drivers = [browser]
+    pool = DriverPool(drivers)
+    try:
+        # Start login
+        login_component = LinkedInAuthenticator(driver=browser)
+        login_component.set_secrets(secrets["email"], secrets["password"])
+        login_component.start()
+        # Extra drivers reuse the session cookies of the logged-in one
+        for i in range(1, parameters.get("linkedin_drivers", 1)):
+            drivers.append(init_browser(f"Default-{i}"))
+        pool = DriverPool(drivers)
+        pool.share_cookies(browser, login_component.home_url)
+        # Job manager
+        job_manager = JobManager(browser, db)
+        job_manager.set_parameters(parameters)
+        job_count = job_manager.collecting_data(pool)
+        job_manager.retrieve_job_description(pool)
+        return job_count
+    finally:
+        pool.quit()
+
+
+def crawl_itviec(parameters: Dict, secrets: Dict, db) -> int:
+    job_manager = ITViecJobManager(cloudscraper.create_scraper(), db)
+    job_manager.set_parameters(parameters)
+    job_count = job_manager.collecting_data()
+    job_manager.retrieve_job_details()
+    return job_count
+
+
+def crawl_topcv(parameters: Dict, secrets: Dict, db) -> int:
+    job_manager = TopCVJobManager(cloudscraper.create_scraper(), db)
+    job_manager.set_parameters(parameters)
+    job_count = job_manager.collecting_data()
+    job_manager.retrieve_job_details()
+    return job_count
+
+
+SOURCE_CRAWLERS = {
+    "LinkedIn": crawl_linkedin,
+    "ITViec": crawl_itviec,
+    "TopCV": crawl_topcv,
+}
+
+
+def run_source(source: str, parameters: Dict, secrets: Dict) -> Dict:
+    """Collect and fetch details for one source, isolated from the others."""
+    db = Session()
+    started = time.monotonic()
+    result = {"source": source, "status": "ok", "new_jobs": 0, "error": None}
+    try:
+        result["new_jobs"] = SOURCE_CRAWLERS[source](parameters, secrets, db) or 0
+    except Exception as e:
+        logger.error(f"{source} crawl failed: {e}")
+        traceback.print_exc()
+        result.update(status="failed", error=str(e))
+    finally:
+        db.close()
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+def log_summary(results: List[Dict]):
+    for result in results:
+        line = (
+            f"{result['source']:<10} {result['status']:<7} "
+            f"{result['new_jobs']:>6} new jobs in {result['seconds']:.0f}s"
+        )
+        if result["error"]:
+            line += f" ({result['error']})"
+        logger.info(line)
+    failed = [result["source"] for result in results if result["status"] != "ok"]
+    total = sum(result["new_jobs"] for result in results)
+    logger.info(f"Crawl finished: {total} new jobs, failed sources: {failed or 'none'}")
+
+
+def run_job_crawler() -> List[Dict]:
     try:
         logger.info(f"Starting job crawler at {datetime.now()}")
         config_file = "./configs/work_preferences.yaml"
@@ -35,39 +120,26 @@ def run_job_crawler():
         secrets = ConfigValidator.validate_secrets(secrets_file)
         # logger.info(parameters)
 
-        if "LinkedIn" in parameters["job_sources"]:
-            # Init browser
-            browser = init_browser()
-            try:
-                # Start login
-                login_component = LinkedInAuthenticator(driver=browser)
-                login_component.set_secrets(secrets["email"], secrets["password"])
-                login_component.start()
-                # Job manager
-                job_manager = JobManager(browser)
-                job_manager.set_parameters(parameters)
-                job_manager.collecting_data()
-                job_manager.retrieve_job_description()
-            finally:
-                browser.quit()
-
-        if "ITViec" in parameters["job_sources"]:
-            scraper = cloudscraper.create_scraper()
-            job_manager = ITViecJobManager(scraper)
-            job_manager.set_parameters(parameters)
-            job_manager.collecting_data()
-            job_manager.retrieve_job_details()
-
-        if "TopCV" in parameters["job_sources"]:
-            scraper = cloudscraper.create_scraper()
-            job_manager = TopCVJobManager(scraper)
-            job_manager.set_parameters(parameters)
-            job_manager.collecting_data()
-            job_manager.retrieve_job_details()
+        # Sources live on different hosts with their own rate limits, so each
+        # runs as its own pipeline with its own DB session
+        sources = [
+            source for source in SOURCE_CRAWLERS if source in parameters["job_sources"]
+        ]
+        if not sources:
+            return []
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            results = list(
+                executor.map(
+                    lambda source: run_source(source, parameters, secrets), sources
+                )
+            )
+        log_summary(results)
+        return results
 
     except Exception as e:
         error_message = f"An unexpected error occurred: {e}"
         logger.error(error_message)
+        return []
 
 
 def schedule_job_crawler():
@@ -1,22 +1,32 @@
-import os
+import asyncio
+import base64
+import hashlib
+import json
 from datetime import date
 from typing import List, Optional
 
-import google.generativeai as genai
 from dotenv import load_dotenv
-from elasticsearch import Elasticsearch
-from fastapi import Depends, FastAPI, Query
+from fastapi import Depends, FastAPI, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import desc
-
-from src.models import Favorite, JobListing, JobSource, Session
+from sqlalchemy import delete, desc, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from src.async_db import AsyncSessionLocal, get_async_db
+from src.logger import logger
+from src.models import DataVersion, Favorite, JobListing, JobSource
+from src.search import get_search_backend
+from src.translation import Translator, get_translation_model
+from src.translation_store import DbTranslationStore
+from src.ttl_cache import TTLCache
 
 load_dotenv(override=True)
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel("gemini-2.0-flash")
+# Gemini by default, TRANSLATION_MODEL=stub for an offline model
+translator = Translator(get_translation_model(), DbTranslationStore())
 
 
 # Pydantic Schemas
@@ -50,6 +60,7 @@ class JobListingResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
 
 
 class FavoriteSchema(BaseModel):
@@ -81,151 +92,332 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-es = Elasticsearch(os.getenv("ELASTICSEARCH_URL"))
+# Elasticsearch by default, or SEARCH_BACKEND=local for the in-process index
+search_backend = get_search_backend()
+
+# Totals per filter combination; exact counts are recomputed at most once a minute
+count_cache = TTLCache(maxsize=256, ttl=60)
+# Favorite totals are keyed by the favorites version, which every (un)save bumps
+favorite_count_cache = TTLCache(maxsize=256, ttl=60)
+# Rendered bodies of /job-sources, /locations and the first /jobs pages, keyed by
+# the data version the crawler bumps whenever it commits changes
+response_cache = TTLCache(maxsize=512, ttl=600)
+data_version_cache = TTLCache(maxsize=1, ttl=5)
+HOT_PAGES = 3
+CACHE_CONTROL = "public, max-age=30"
+
 
+def encode_cursor(job_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": job_id}).encode()).decode()
 
-def get_db():
-    db = Session()
+
+def decode_cursor(cursor: str) -> Optional[int]:
     try:
-        yield db
-    finally:
-        db.close()
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+async def versions(db: AsyncSession) -> tuple:
+    """(data version, favorites version), shared by every worker through the DB."""
+
+    async def fetch_versions():
+        result = await db.execute(
+            select(DataVersion.version, DataVersion.favorites_version).where(
+                DataVersion.id == 1
+            )
+        )
+        row = result.one_or_none()
+        return (row.version, row.favorites_version) if row else (0, 0)
+
+    return await data_version_cache.aget_or_set("versions", fetch_versions)
+
+
+async def data_version(db: AsyncSession) -> int:
+    return (await versions(db))[0]
+
+
+async def bump_favorites_version(db: AsyncSession):
+    """Mark favorites as changed, in the caller's transaction."""
+    await db.execute(
+        update(DataVersion)
+        .where(DataVersion.id == 1)
+        .values(favorites_version=DataVersion.favorites_version + 1)
+    )
+
+
+def render(data) -> tuple:
+    body = json.dumps(jsonable_encoder(data)).encode()
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+async def cached_response(
+    request: Request, db: AsyncSession, key: tuple, build
+) -> Response:
+    async def build_and_render():
+        return render(await build())
+
+    body, etag = await response_cache.aget_or_set(
+        (*key, await data_version(db)), build_and_render
+    )
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/job-sources")
-def read_job_sources(db=Depends(get_db)):
-    sources = db.query(JobSource).all()
-    return [source.to_dict() for source in sources]
+async def read_job_sources(request: Request, db=Depends(get_async_db)):
+    async def build():
+        sources = (await db.execute(select(JobSource))).scalars().all()
+        return [source.to_dict() for source in sources]
+
+    return await cached_response(request, db, ("job-sources",), build)
 
 
 @app.get("/locations")
-def get_locations(db=Depends(get_db)):
-    locations = db.query(JobListing.location).distinct().all()
-    return [loc[0] for loc in locations if loc[0]]  # Filter out None values
+async def get_locations(request: Request, db=Depends(get_async_db)):
+    async def build():
+        locations = await db.execute(select(JobListing.location).distinct())
+        return [loc[0] for loc in locations if loc[0]]  # Filter out None values
+
+    return await cached_response(request, db, ("locations",), build)
+
+
+async def query_jobs(
+    db: AsyncSession,
+    source: Optional[str],
+    page: int,
+    per_page: int,
+    favorites: bool,
+    locations: Optional[List[str]],
+    after_id: Optional[int],
+) -> JobListingResponse:
+    filters = []
+    if source:
+        filters.append(
+            JobListing.source_id
+            == select(JobSource.id).where(JobSource.name == source).scalar_subquery()
+        )
+    if locations and len(locations) > 0:
+        filters.append(JobListing.location.in_(locations))
+    if favorites:
+        # Served by the unique index on favorites.job_listing_id
+        filters.append(
+            select(Favorite.id).where(Favorite.job_listing_id == JobListing.id).exists()
+        )
+
+    async def count():
+        return await db.scalar(select(func.count(JobListing.id)).where(*filters))
+
+    version, favorites_version = await versions(db)
+    count_key = (
+        source,
+        tuple(sorted(locations or [])),
+        favorites,
+        version,
+        favorites_version if favorites else None,
+    )
+    cache = favorite_count_cache if favorites else count_cache
+    total = await cache.aget_or_set(count_key, count)
+
+    query = (
+        select(JobListing)
+        .where(*filters)
+        .options(selectinload(JobListing.source))
+        .order_by(desc(JobListing.id))
+    )
+    if after_id is None:
+        query = query.offset((page - 1) * per_page)
+    else:
+        query = query.where(JobListing.id < after_id)
+    # One extra row tells whether there is a next page
+    jobs = (await db.execute(query.limit(per_page + 1))).scalars().all()
+    next_cursor = encode_cursor(jobs[per_page - 1].id) if len(jobs) > per_page else None
+    jobs_data = [JobListingSchema.model_validate(job) for job in jobs[:per_page]]
+    return JobListingResponse(
+        jobs=jobs_data,
+        total=total,
+        page=page,
+        per_page=per_page,
+        next_cursor=next_cursor,
+    )
 
 
 @app.get("/jobs")
-def read_jobs(
+async def read_jobs(
+    request: Request,
     source: Optional[str] = None,
     search: Optional[str] = None,
     page: int = 1,
     per_page: int = 10,
     favorites: bool = False,
     locations: List[str] = Query(None),
-    db=Depends(get_db),
+    cursor: Optional[str] = None,
+    db=Depends(get_async_db),
 ):
-    index_name = "job_tester_listing"
+    # With a cursor, results continue after the last job of the previous page
+    # (keyset pagination) and `page` is ignored.
+    after_id = None
+    if cursor:
+        after_id = decode_cursor(cursor)
+        if after_id is None:
+            return {"error": "Invalid cursor"}
     if search:
-        es_query = {
-            "query": {
-                "bool": {
-                    "must": {
-                        "multi_match": {
-                            "query": search,
-                            "fields": ["title", "company", "location", "description"],
-                            "type": "best_fields",
-                        }
-                    },
-                    "filter": [],
-                }
-            },
-            "sort": [{"id": {"order": "desc"}}],
-            "from": (page - 1) * per_page,
-            "size": per_page,
-        }
-        if source:
-            es_query["query"]["bool"]["filter"].append({"term": {"source": source}})
-        if locations and len(locations) > 0:
-            es_query["query"]["bool"]["filter"].append(
-                {"terms": {"location": locations}}
+        hits = await asyncio.to_thread(
+            search_backend.search, search, source, locations, page, per_page, after_id
+        )
+        if hits.documents is not None:
+            # Elasticsearch returns plain dictionaries
+            jobs_data = []
+            for job in hits.documents:
+                if job.get("source") and not isinstance(job["source"], dict):
+                    job["source"] = {"name": job["source"], "id": job["source_id"]}
+                jobs_data.append(JobListingSchema.model_validate(job))
+        else:
+            result = await db.execute(
+                select(JobListing)
+                .where(JobListing.id.in_(hits.ids))
+                .options(selectinload(JobListing.source))
             )
-        es_response = es.search(index=index_name, body=es_query)
-        hits = es_response["hits"]["hits"]
-        total = (
-            es_response["hits"]["total"]["value"]
-            if isinstance(es_response["hits"]["total"], dict)
-            else es_response["hits"]["total"]
+            jobs_by_id = {job.id: job for job in result.scalars()}
+            jobs_data = [
+                JobListingSchema.model_validate(jobs_by_id[job_id])
+                for job_id in hits.ids
+                if job_id in jobs_by_id
+            ]
+        next_cursor = (
+            encode_cursor(hits.next_after_id)
+            if hits.next_after_id is not None
+            else None
         )
-        # Elasticsearch returns plain dictionaries
-        raw_jobs = [hit["_source"] for hit in hits]
-        jobs_data = []
-        for job in raw_jobs:
-            if job.get("source") and not isinstance(job["source"], dict):
-                job["source"] = {"name": job["source"], "id": job["source_id"]}
-            jobs_data.append(JobListingSchema.model_validate(job))
         return JobListingResponse(
-            jobs=jobs_data, total=total, page=page, per_page=per_page
+            jobs=jobs_data,
+            total=hits.total,
+            page=page,
+            per_page=per_page,
+            next_cursor=next_cursor,
         )
     else:
-        query = db.query(JobListing).join(JobSource)
-        if source:
-            query = query.filter(JobSource.name == source)
-        if locations and len(locations) > 0:
-            query = query.filter(JobListing.location.in_(locations))
-        if favorites:
-            favorite_job_ids = db.query(Favorite.job_listing_id).all()
-            favorite_job_ids = [id[0] for id in favorite_job_ids]
-            query = query.filter(JobListing.id.in_(favorite_job_ids))
-        total = query.count()
-        jobs = (
-            query.order_by(desc(JobListing.id))
-            .offset((page - 1) * per_page)
-            .limit(per_page)
-            .all()
-        )
-        jobs_data = [JobListingSchema.model_validate(job) for job in jobs]
-        return JobListingResponse(
-            jobs=jobs_data, total=total, page=page, per_page=per_page
-        )
+
+        def build():
+            return query_jobs(
+                db, source, page, per_page, favorites, locations, after_id
+            )
+
+        # Favorites change with every (un)save and deep pages are rarely shared
+        if favorites or after_id is not None or page > HOT_PAGES:
+            return await build()
+        key = ("jobs", source, tuple(sorted(locations or [])), page, per_page)
+        return await cached_response(request, db, key, build)
 
 
 # Favorites endpoints
 @app.get("/favorites")
-def get_favorites(db=Depends(get_db)):
-    favorites = db.query(Favorite.job_listing_id).all()
+async def get_favorites(db=Depends(get_async_db)):
+    favorites = await db.execute(select(Favorite.job_listing_id))
     return [fav[0] for fav in favorites]
 
 
 @app.post("/favorites")
-def create_favorite(favorite: FavoriteSchema, db=Depends(get_db)):
+async def create_favorite(favorite: FavoriteSchema, db=Depends(get_async_db)):
     db_favorite = Favorite(job_listing_id=favorite.job_listing_id)
     db.add(db_favorite)
     try:
-        db.commit()
-        db.refresh(db_favorite)
+        await bump_favorites_version(db)
+        await db.commit()
+        # Other workers see the new version once their cached copy expires
+        data_version_cache.clear()
         return FavoriteResponse.model_validate(db_favorite)
     except:
-        db.rollback()
+        await db.rollback()
         return {"error": "Could not save favorite"}
 
 
 @app.delete("/favorites/{job_id}")
-def delete_favorite(job_id: int, db=Depends(get_db)):
-    favorite = db.query(Favorite).filter(Favorite.job_listing_id == job_id).first()
-    if favorite:
-        db.delete(favorite)
-        db.commit()
+async def delete_favorite(job_id: int, db=Depends(get_async_db)):
+    result = await db.execute(delete(Favorite).where(Favorite.job_listing_id == job_id))
+    if result.rowcount:
+        await bump_favorites_version(db)
+    await db.commit()
+    if result.rowcount:
+        data_version_cache.clear()
         return {"message": "Favorite deleted"}
     return {"error": "Favorite not found"}
 
 
 @app.post("/translate")
-async def translate_job_description(request: TranslationRequest, db=Depends(get_db)):
+async def translate_job_description(
+    request: TranslationRequest, db=Depends(get_async_db)
+):
     # Check if translation already exists
-    job = db.query(JobListing).filter(JobListing.id == request.job_id).first()
+    job = await db.get(JobListing, request.job_id)
     if not job:
         return {"error": "Job not found"}
 
     if job.translated_description:
         return TranslationResponse(translated_text=job.translated_description)
 
-    # Generate translation using Gemini
-    prompt = f"Translate the following English text into Vietnamese while maintaining the intended formatting as closely as possible. Use **abc** for bold text and * abc for bundle formatting, but adapt flexibly if needed to ensure readability and natural presentation.:\n\n{request.text}"
-    response = model.generate_content(prompt)
-    translated_text = response.text
+    # Shared across listings with the same text; concurrent clicks share one call
+    translated_text = await translator.translate(request.text)
 
     # Save translation to database
     job.translated_description = translated_text
-    db.commit()
+    await db.commit()
 
     return TranslationResponse(translated_text=translated_text)
+
+
+def sse(data, event: Optional[str] = None) -> str:
+    message = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{message}" if event else message
+
+
+async def saved_translation(translated_text: str):
+    yield sse({"text": translated_text})
+    yield sse({"translated_text": translated_text}, event="done")
+
+
+async def stream_translation(job_id: int, text: str):
+    chunks = []
+    try:
+        async for chunk in translator.translate_stream(text):
+            chunks.append(chunk)
+            yield sse({"text": chunk})
+    except Exception as e:
+        logger.error(f"Error translating job {job_id}: {e}")
+        yield sse({"error": "Translation failed"}, event="error")
+        return
+
+    # The request's session is gone by now, so save with a fresh one
+    translated_text = "".join(chunks)
+    try:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(JobListing, job_id)
+            if job and not job.translated_description:
+                job.translated_description = translated_text
+                await db.commit()
+    except Exception as e:
+        logger.error(f"Error saving translation for job {job_id}: {e}")
+    yield sse({"translated_text": translated_text}, event="done")
+
+
+@app.post("/translate/stream")
+async def stream_job_description_translation(
+    request: TranslationRequest, db=Depends(get_async_db)
+):
+    """Server-sent events: ``data`` chunks of text, then a ``done`` event."""
+    job = await db.get(JobListing, request.job_id)
+    if not job:
+        return {"error": "Job not found"}
+
+    if job.translated_description:
+        events = saved_translation(job.translated_description)
+    else:
+        events = stream_translation(request.job_id, request.text)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,54 @@
+import os
+from typing import AsyncIterator, Dict
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+load_dotenv(override=True)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """Swap the sync driver of DB_URL for its asyncio counterpart."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def engine_options(url: str) -> Dict:
+    """Pool settings for the API, tunable through the environment."""
+    options = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() != "postgresql":
+        return options
+    statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        connect_args={
+            "server_settings": {"statement_timeout": str(statement_timeout_ms)},
+            "command_timeout": statement_timeout_ms / 1000 + 5,
+        },
+    )
+    return options
+
+
+async_engine = create_async_engine(
+    async_url(os.getenv("DB_URL")), **engine_options(os.getenv("DB_URL"))
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,148 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from src.job import Job
+from src.logger import logger
+
+# Words and single punctuation marks, so "Node.js" and "C++" stay matchable
+TOKEN_REGEX = re.compile(r"\w+|[^\w\s]")
+
+Entry = Union[str, Sequence[str]]
+
+
+def tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(TOKEN_REGEX.findall(text.casefold()))
+
+
+class Blacklist:
+    """Matches text against many blacklist entries in a single pass.
+
+    A string entry is a phrase whose words must appear together and in order,
+    e.g. ``"Data Engineer"``. A list entry, e.g. ``["Senior", "Java"]``, matches
+    when all of its words appear anywhere in the text, in any order.
+
+    Every phrase and every word of a list entry is compiled into one
+    Aho-Corasick automaton over tokens, so matching a text costs one walk over
+    its tokens no matter how many entries there are.
+    """
+
+    def __init__(self, entries: Iterable[Entry]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        # Pattern id -> the phrase entry it belongs to, or the any-order rules
+        self._phrase_entries: Dict[int, str] = {}
+        self._word_rules: Dict[int, List[int]] = {}
+        self._rules: List[Tuple[str, int]] = []
+        patterns: Dict[Tuple[str, ...], int] = {}
+
+        def add_pattern(tokens: Tuple[str, ...]) -> int:
+            if tokens not in patterns:
+                patterns[tokens] = len(patterns)
+                self._insert(tokens, patterns[tokens])
+            return patterns[tokens]
+
+        for entry in entries:
+            if isinstance(entry, str):
+                tokens = tokenize(entry)
+                if tokens:
+                    self._phrase_entries.setdefault(add_pattern(tokens), entry)
+                continue
+            words = {tokenize(word) for word in entry} - {()}
+            if not words:
+                continue
+            rule_id = len(self._rules)
+            self._rules.append((" ".join(entry), len(words)))
+            for word in words:
+                self._word_rules.setdefault(add_pattern(word), []).append(rule_id)
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._phrase_entries) + len(self._rules)
+
+    def _insert(self, tokens: Tuple[str, ...], pattern_id: int):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+        self._output[state].append(pattern_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(token, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def find(self, text: Optional[str]) -> Optional[str]:
+        """Return the first entry matching ``text``, or None."""
+        if not text or not len(self):
+            return None
+        state = 0
+        seen = set()
+        rule_hits: Dict[int, int] = {}
+        for token in tokenize(text):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for pattern_id in self._output[state]:
+                if pattern_id in self._phrase_entries:
+                    return self._phrase_entries[pattern_id]
+                if pattern_id in seen:
+                    continue
+                seen.add(pattern_id)
+                for rule_id in self._word_rules[pattern_id]:
+                    rule_hits[rule_id] = rule_hits.get(rule_id, 0) + 1
+                    entry, word_count = self._rules[rule_id]
+                    if rule_hits[rule_id] == word_count:
+                        return entry
+        return None
+
+    def find_all(self, texts: Iterable[Optional[str]]) -> List[Optional[str]]:
+        return [self.find(text) for text in texts]
+
+
+class JobBlacklist:
+    """Title and company blacklists built once from the work preferences."""
+
+    def __init__(
+        self, title_blacklist: Iterable[Entry], company_blacklist: Iterable[Entry]
+    ):
+        self.titles = Blacklist(title_blacklist)
+        self.companies = Blacklist(company_blacklist)
+
+    @classmethod
+    def from_parameters(cls, parameters: Dict) -> "JobBlacklist":
+        return cls(
+            parameters.get("title_blacklist") or [],
+            parameters.get("company_blacklist") or [],
+        )
+
+    def match(self, company: Optional[str], title: Optional[str]) -> Optional[str]:
+        """Return the entry that blacklists a job, or None."""
+        return self.companies.find(company) or self.titles.find(title)
+
+    def is_blacklisted(self, company: Optional[str], title: Optional[str]) -> bool:
+        return self.match(company, title) is not None
+
+    def filter(self, job_list: List[Job]) -> List[Job]:
+        kept = []
+        for job in job_list:
+            entry = self.match(job.company, job.title)
+            if entry is None:
+                kept.append(job)
+            else:
+                logger.info(f"Blacklist: Job {job.title} at {job.company} ({entry}).")
+        return kept
@@ -2,60 +2,102 @@ import os
 import sys
 
 sys.path.insert(0, os.getcwd())
-import re
+import argparse
+from collections import Counter
+from typing import List, Tuple
 
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.orm import Session
 from tqdm import tqdm
 
 from main import ConfigValidator
+from src.blacklist import JobBlacklist
 from src.logger import logger
-from src.models import JobListing, session
+from src.models import Favorite, JobListing, session
+from src.persistence import bump_data_version
 
 
-def is_title_blacklisted(job_title, title_blacklist_patterns):
-    for pattern in title_blacklist_patterns:
-        if re.search(rf"\b{re.escape(pattern)}\b", job_title, re.IGNORECASE):
-            logger.info(f"Title: {job_title} matched pattern: '{pattern}'")
-            return True
-    return False
+def count_jobs(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(JobListing)).scalar_one()
 
 
-def is_company_blacklisted(company, company_blacklist_patterns):
-    for pattern in company_blacklist_patterns:
-        if re.search(rf"\b{re.escape(pattern)}\b", company, re.IGNORECASE):
-            logger.info(f"Company: {company} matched pattern: '{pattern}'")
-            return True
-    return False
+def find_blacklisted_jobs(
+    db: Session, blacklist: JobBlacklist, batch_size: int = 5000
+) -> Tuple[List[int], Counter]:
+    """Stream (id, title, company) rows and return the IDs that are blacklisted.
 
+    Only the matching IDs are kept in memory, never the rows themselves.
+    """
+    stmt = (
+        select(JobListing.id, JobListing.title, JobListing.company)
+        .where(JobListing.title.is_not(None), JobListing.company.is_not(None))
+        .execution_options(yield_per=batch_size)
+    )
+    job_ids, matches = [], Counter()
+    with tqdm(total=count_jobs(db)) as progress:
+        for rows in db.execute(stmt).partitions():
+            for job_id, title, company in rows:
+                entry = blacklist.match(company, title)
+                if entry is None:
+                    continue
+                logger.info(f"Blacklisted job: {title} at {company} ({entry})")
+                job_ids.append(job_id)
+                matches[entry] += 1
+            progress.update(len(rows))
+    return job_ids, matches
 
-def clean_blacklist():
+
+def delete_jobs(db: Session, job_ids: List[int], chunk_size: int = 500) -> int:
+    """Delete jobs by ID in chunks, keeping the ones saved as favorites."""
+    deleted = 0
+    for start in range(0, len(job_ids), chunk_size):
+        chunk = job_ids[start : start + chunk_size]
+        stmt = delete(JobListing).where(
+            JobListing.id.in_(chunk),
+            ~exists().where(Favorite.job_listing_id == JobListing.id),
+        )
+        try:
+            chunk_deleted = db.execute(stmt).rowcount
+            if chunk_deleted:
+                bump_data_version(db)
+            db.commit()
+            deleted += chunk_deleted
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error deleting {len(chunk)} jobs: {e}")
+    return deleted
+
+
+def clean_blacklist(dry_run: bool = False, batch_size: int = 5000):
     try:
         config_file = "./configs/work_preferences.yaml"
         parameters = ConfigValidator.validate_config(config_file)
         logger.info(parameters)
-        title_blacklist = parameters.get("title_blacklist", [])
-        company_blacklist = parameters.get("company_blacklist", [])
-
-        job_records = session.query(JobListing).all()
-        logger.info(f"Number of jobs before cleaned: {len(job_records)}")
-        for job_record in tqdm(job_records):
-            if job_record.company is None or job_record.title is None:
-                continue
-            if not is_title_blacklisted(
-                job_record.title, title_blacklist
-            ) and not is_company_blacklisted(job_record.company, company_blacklist):
-                continue
-            logger.info(f"Deleting job: {job_record.title} at {job_record.company}")
-            session.delete(job_record)
-            try:
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error deleting job: {e}")
-        job_records = session.query(JobListing).all()
-        logger.info(f"Number of jobs after cleaned: {len(job_records)}")
+        blacklist = JobBlacklist.from_parameters(parameters)
+
+        logger.info(f"Number of jobs before cleaned: {count_jobs(session)}")
+        job_ids, matches = find_blacklisted_jobs(session, blacklist, batch_size)
+        for entry, count in matches.most_common():
+            logger.info(f"{count:>6} jobs matched '{entry}'")
+        if dry_run:
+            logger.info(f"Dry run: {len(job_ids)} jobs would be deleted")
+            return
+
+        deleted = delete_jobs(session, job_ids)
+        if deleted < len(job_ids):
+            logger.info(f"Kept {len(job_ids) - deleted} blacklisted favorite jobs")
+        logger.info(f"Number of jobs after cleaned: {count_jobs(session)}")
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
 
 
 if __name__ == "__main__":
-    clean_blacklist()
+    parser = argparse.ArgumentParser(
+        description="Delete stored jobs that match the blacklists"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would be deleted"
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    clean_blacklist(dry_run=args.dry_run, batch_size=args.batch_size)
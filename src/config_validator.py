@@ -86,4 +86,13 @@ class ConfigValidator:
                 )
             if parameters[blacklist] is None:
                 parameters[blacklist] = []
+            for entry in parameters[blacklist]:
+                if isinstance(entry, list) and all(
+                    isinstance(word, str) for word in entry
+                ):
+                    continue
+                if not isinstance(entry, str):
+                    raise ConfigError(
+                        f"'{blacklist}' entries must be strings or lists of words in config file {config_yaml_path}"
+                    )
         return parameters
@@ -0,0 +1,65 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from selenium import webdriver
+
+from src.logger import logger
+
+
+class DriverPool:
+    """A fixed set of Chrome drivers that work through a shared task queue.
+
+    Each task borrows an idle driver for its whole duration, so a driver is
+    never used by two threads at once.
+    """
+
+    def __init__(self, drivers: List[webdriver.Chrome]):
+        self.drivers = drivers
+        self._idle: queue.Queue = queue.Queue()
+        for driver in drivers:
+            self._idle.put(driver)
+
+    def __len__(self):
+        return len(self.drivers)
+
+    def share_cookies(self, source: webdriver.Chrome, url: str):
+        cookies = source.get_cookies()
+        for driver in self.drivers:
+            if driver is source:
+                continue
+            # Cookies can only be set for the domain currently loaded
+            driver.get(url)
+            for cookie in cookies:
+                try:
+                    driver.add_cookie(cookie)
+                except Exception as e:
+                    logger.warning(f"Could not copy cookie {cookie.get('name')}: {e}")
+        logger.info(f"Shared {len(cookies)} cookies across {len(self)} drivers")
+
+    def _run(self, func: Callable[[webdriver.Chrome, Any], Any], item: Any):
+        driver = self._idle.get()
+        try:
+            return func(driver, item)
+        finally:
+            self._idle.put(driver)
+
+    def map(
+        self, func: Callable[[webdriver.Chrome, Any], Any], items: Iterable
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Run func(driver, item) for every item and yield (item, result) as they finish."""
+        with ThreadPoolExecutor(max_workers=len(self)) as executor:
+            futures = {executor.submit(self._run, func, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result()
+                except Exception as e:
+                    logger.error(f"Task {item} failed: {e}")
+
+    def quit(self):
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(e)
@@ -0,0 +1,310 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+import argparse
+import time
+from datetime import date, datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import scan, streaming_bulk
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from src.logger import logger
+from src.models import JobListing, JobSource, SearchIndexWatermark
+from src.models import Session as SessionFactory
+from src.persistence import get_data_version
+
+load_dotenv(override=True)
+
+# Name the API searches; with aliases in place it points at a versioned index
+INDEX_ALIAS = os.getenv("ELASTICSEARCH_INDEX", "job_tester_listing")
+
+INDEX_MAPPINGS = {
+    "properties": {
+        "id": {"type": "long"},
+        "source_id": {"type": "integer"},
+        "source": {"type": "keyword"},
+        "external_id": {"type": "keyword"},
+        "title": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        "company": {"type": "text", "fields": {"keyword": {"type": "keyword"}}},
+        "location": {"type": "keyword"},
+        "description": {"type": "text"},
+        "salary": {"type": "keyword", "index": False},
+        "deadline": {"type": "keyword", "index": False},
+        "url": {"type": "keyword", "index": False},
+        "crawled_at": {"type": "date"},
+        "is_expired": {"type": "boolean"},
+    }
+}
+
+JOB_COLUMNS = (
+    JobListing.id,
+    JobListing.source_id,
+    JobSource.name,
+    JobListing.external_id,
+    JobListing.title,
+    JobListing.company,
+    JobListing.location,
+    JobListing.description,
+    JobListing.salary,
+    JobListing.deadline,
+    JobListing.url,
+    JobListing.crawled_at,
+    JobListing.is_expired,
+)
+
+
+def job_document(row) -> Dict:
+    return {
+        "id": row.id,
+        "source_id": row.source_id,
+        "source": row.name,
+        "external_id": row.external_id,
+        "title": row.title,
+        "company": row.company,
+        "location": row.location,
+        "description": row.description,
+        "salary": row.salary,
+        "deadline": row.deadline,
+        "url": row.url,
+        "crawled_at": row.crawled_at.isoformat() if row.crawled_at else None,
+        "is_expired": row.is_expired,
+    }
+
+
+class JobIndexer:
+    """Copies job_listings into Elasticsearch with the bulk API.
+
+    ``sync()`` sends rows past the stored watermark: new ids, plus rows crawled
+    on or after the last crawl date seen, which picks up descriptions filled
+    in after insert. It also deletes documents whose jobs were deleted.
+    Edits to older rows (location backfills, expirations) need ``reindex()``,
+    which rebuilds everything into a fresh index and swaps the alias in one
+    atomic call, so searches keep working meanwhile.
+    """
+
+    def __init__(
+        self,
+        es: Elasticsearch,
+        db: Session,
+        alias: str = INDEX_ALIAS,
+        chunk_size: int = 500,
+        max_retries: int = 3,
+        batch_size: int = 2000,
+    ):
+        self.es = es
+        self.db = db
+        self.alias = alias
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+
+    def _rows(self, *filters) -> Iterator:
+        stmt = (
+            select(*JOB_COLUMNS)
+            .join(JobSource, JobListing.source_id == JobSource.id)
+            .where(*filters)
+            .order_by(JobListing.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        yield from self.db.execute(stmt)
+
+    def _bulk(self, index: str, rows) -> Tuple[int, int, int, Optional[date]]:
+        """Index rows, returning (sent, failed, max id, max crawled_at)."""
+        sent, last_id, last_crawled_at = 0, 0, None
+
+        def actions():
+            nonlocal sent, last_id, last_crawled_at
+            for row in rows:
+                sent += 1
+                last_id = max(last_id, row.id)
+                if row.crawled_at and (
+                    last_crawled_at is None or row.crawled_at > last_crawled_at
+                ):
+                    last_crawled_at = row.crawled_at
+                yield {"_index": index, "_id": row.id, "_source": job_document(row)}
+
+        failed = 0
+        for _, item in streaming_bulk(
+            self.es,
+            actions(),
+            chunk_size=self.chunk_size,
+            max_retries=self.max_retries,
+            raise_on_error=False,
+            yield_ok=False,
+        ):
+            failed += 1
+            logger.error(f"Failed to index job: {item}")
+        return sent, failed, last_id, last_crawled_at
+
+    def _delete_removed(self) -> int:
+        """Delete documents whose jobs are no longer in the database."""
+        job_count = self.db.execute(
+            select(func.count()).select_from(JobListing)
+        ).scalar_one()
+        self.es.indices.refresh(index=self.alias)
+        # Every job is indexed, so only a bigger index has anything to delete
+        if self.es.count(index=self.alias)["count"] <= job_count:
+            return 0
+        job_ids = set(self.db.execute(select(JobListing.id)).scalars())
+        actions = (
+            {"_op_type": "delete", "_index": hit["_index"], "_id": hit["_id"]}
+            for hit in scan(self.es, index=self.alias, _source=False)
+            if int(hit["_id"]) not in job_ids
+        )
+        removed = 0
+        for ok, item in streaming_bulk(
+            self.es,
+            actions,
+            chunk_size=self.chunk_size,
+            max_retries=self.max_retries,
+            raise_on_error=False,
+        ):
+            if ok or item.get("delete", {}).get("status") == 404:
+                removed += 1
+            else:
+                logger.error(f"Failed to delete job: {item}")
+        return removed
+
+    def _watermark(self) -> SearchIndexWatermark:
+        watermark = (
+            self.db.query(SearchIndexWatermark).filter_by(index_name=self.alias).first()
+        )
+        if watermark is None:
+            watermark = SearchIndexWatermark(
+                index_name=self.alias, last_id=0, data_version=0
+            )
+            self.db.add(watermark)
+        return watermark
+
+    def _save_watermark(self, last_id, last_crawled_at, data_version):
+        watermark = self._watermark()
+        watermark.last_id = max(watermark.last_id or 0, last_id)
+        if last_crawled_at and (
+            watermark.last_crawled_at is None
+            or last_crawled_at > watermark.last_crawled_at
+        ):
+            watermark.last_crawled_at = last_crawled_at
+        watermark.data_version = data_version
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving index watermark: {e}")
+
+    def _create_index(self) -> str:
+        index = f"{self.alias}_{datetime.now():%Y%m%d%H%M%S}"
+        self.es.indices.create(
+            index=index,
+            mappings=INDEX_MAPPINGS,
+            # No refreshes while the bulk load runs
+            settings={"refresh_interval": "-1"},
+        )
+        return index
+
+    def sync(self) -> int:
+        """Index rows added or updated since the last pass."""
+        data_version = get_data_version(self.db)
+        watermark = self._watermark()
+        if watermark.data_version == data_version and watermark.last_id:
+            return 0
+        if not self.es.indices.exists_alias(name=self.alias):
+            logger.info(f"No {self.alias} alias yet, running a full reindex")
+            return self.reindex()
+
+        filters = [JobListing.id > watermark.last_id]
+        if watermark.last_crawled_at:
+            filters.append(JobListing.crawled_at >= watermark.last_crawled_at)
+        count, failed, last_id, last_crawled_at = self._bulk(
+            self.alias, self._rows(or_(*filters))
+        )
+        removed = self._delete_removed()
+        self.db.rollback()  # end the read transaction before saving
+        if failed:
+            logger.warning(f"{failed} jobs failed to index, will retry next pass")
+            return count - failed
+        if removed:
+            logger.info(f"Deleted {removed} removed jobs from {self.alias}")
+        self._save_watermark(last_id, last_crawled_at, data_version)
+        if count:
+            logger.info(f"Indexed {count} jobs into {self.alias}")
+        return count
+
+    def reindex(self) -> int:
+        """Rebuild the whole index and atomically point the alias at it."""
+        data_version = get_data_version(self.db)
+        index = self._create_index()
+        count, failed, last_id, last_crawled_at = self._bulk(index, self._rows())
+        self.db.rollback()
+        if failed:
+            logger.error(f"{failed} jobs failed to index, keeping the current index")
+            self.es.indices.delete(index=index)
+            return 0
+        self.es.indices.put_settings(index=index, settings={"refresh_interval": "1s"})
+        self.es.indices.refresh(index=index)
+        self._swap_alias(index)
+        self._save_watermark(last_id, last_crawled_at, data_version)
+        logger.info(f"Reindexed {count} jobs into {index}")
+        return count
+
+    def _swap_alias(self, index: str):
+        actions = [{"add": {"index": index, "alias": self.alias}}]
+        old_indices = []
+        if self.es.indices.exists_alias(name=self.alias):
+            old_indices = list(self.es.indices.get_alias(name=self.alias).keys())
+            actions = [
+                {"remove": {"index": old, "alias": self.alias}} for old in old_indices
+            ] + actions
+        elif self.es.indices.exists(index=self.alias):
+            # A plain index still uses the alias name; drop it in the same call
+            actions.insert(0, {"remove_index": {"index": self.alias}})
+        self.es.indices.update_aliases(actions=actions)
+        for old in old_indices:
+            self.es.indices.delete(index=old)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy job listings into Elasticsearch")
+    parser.add_argument(
+        "--full", action="store_true", help="Rebuild the index and swap the alias"
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="Keep syncing new and updated jobs at this interval",
+    )
+    parser.add_argument(
+        "--reindex-every",
+        type=float,
+        default=24 * 3600,
+        metavar="SECONDS",
+        help="With --watch, also rebuild the index this often to pick up edits",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    es = Elasticsearch(os.getenv("ELASTICSEARCH_URL"))
+    indexer = JobIndexer(es, SessionFactory(), chunk_size=args.chunk_size)
+    if args.full:
+        indexer.reindex()
+    last_reindex = time.monotonic()
+    while True:
+        try:
+            if args.watch and time.monotonic() - last_reindex >= args.reindex_every:
+                last_reindex = time.monotonic()
+                indexer.reindex()
+            indexer.sync()
+        except Exception as e:
+            logger.error(f"Error syncing {indexer.alias}: {e}")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
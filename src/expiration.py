@@ -0,0 +1,265 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+import argparse
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import cloudscraper
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+from tqdm import tqdm
+
+from src.fetcher import AsyncFetcher
+from src.http_cache import HttpCache
+from src.linkedin_http import GUEST_JOB_POSTING_URL
+from src.location import fold
+from src.logger import logger
+from src.models import Favorite, JobListing, JobSource, session
+from src.persistence import bump_data_version
+
+EXPIRED_STATUS_CODES = (404, 410)
+# Sorts jobs without a crawl date first
+NEVER_CRAWLED = date(1970, 1, 1)
+TOPCV_DEADLINE_REGEX = re.compile(r"han nop ho so:?\s*(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+class ExpirationChecker:
+    """Tells from one HTTP response per job whether the listing is gone.
+
+    The base check only trusts 404/410; subclasses fetch a cheaper URL or
+    read the page for their site's closed-job marker.
+    """
+
+    method = "GET"
+
+    def __init__(self, fetcher: AsyncFetcher):
+        self.fetcher = fetcher
+
+    def url(self, row) -> str:
+        return row.url
+
+    def check(self, rows: List) -> List[Optional[bool]]:
+        # max_age=0 turns cached pages into conditional requests
+        responses = self.fetcher.fetch_all(
+            [self.url(row) for row in rows],
+            use_cache=True,
+            max_age=0,
+            method=self.method,
+        )
+        return [
+            self.is_expired(row, response) for row, response in zip(rows, responses)
+        ]
+
+    def is_expired(self, row, response) -> Optional[bool]:
+        """True if expired, False if still open, None when it can't tell."""
+        if response is None:
+            return None
+        if response.status_code in EXPIRED_STATUS_CODES:
+            return True
+        if response.status_code != 200:
+            return None
+        return self.page_is_expired(row, response)
+
+    def page_is_expired(self, row, response) -> bool:
+        return False
+
+
+class LinkedInExpirationChecker(ExpirationChecker):
+    """Uses the small guest posting endpoint instead of the full job page."""
+
+    def url(self, row) -> str:
+        if row.external_id:
+            return GUEST_JOB_POSTING_URL.format(row.external_id)
+        return row.url
+
+    def page_is_expired(self, row, response) -> bool:
+        return "closed-job" in response.text or (
+            "No longer accepting applications" in response.text
+        )
+
+
+class ITViecExpirationChecker(ExpirationChecker):
+    """A HEAD request is enough: closed jobs are redirected elsewhere."""
+
+    method = "HEAD"
+
+    def page_is_expired(self, row, response) -> bool:
+        requested = urlparse(row.url).path.rstrip("/")
+        return urlparse(response.url).path.rstrip("/") != requested
+
+
+class TopCVExpirationChecker(ExpirationChecker):
+    def page_is_expired(self, row, response) -> bool:
+        match = TOPCV_DEADLINE_REGEX.search(fold(response.text))
+        if not match:
+            return False
+        day, month, year = map(int, match.groups())
+        try:
+            return date(year, month, day) < date.today()
+        except ValueError:
+            return False
+
+
+def default_checkers() -> Tuple[Dict[str, ExpirationChecker], ExpirationChecker]:
+    def fetcher(cache: Optional[HttpCache] = None):
+        return AsyncFetcher(
+            cloudscraper.create_scraper(), max_concurrency=4, cache=cache
+        )
+
+    checkers = {
+        "LinkedIn": LinkedInExpirationChecker(fetcher()),
+        "ITViec": ITViecExpirationChecker(fetcher()),
+        # Detail pages are already in the HTTP cache from retrieve_job_details
+        "TopCV": TopCVExpirationChecker(fetcher(HttpCache())),
+    }
+    return checkers, ExpirationChecker(fetcher())
+
+
+class ExpirationService:
+    """Checks open listings of every source and marks the closed ones.
+
+    Favorites come first, then the oldest ``crawled_at``. Jobs are read in
+    keyset pages of ``batch_size``; each page is split by source and the
+    sources are checked in parallel, each under its own domain's rate limit,
+    then the expired ids are written in one update.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        checkers: Optional[Dict[str, ExpirationChecker]] = None,
+        default_checker: Optional[ExpirationChecker] = None,
+        batch_size: int = 200,
+    ):
+        if checkers is None:
+            checkers, default_checker = default_checkers()
+        self.db = db
+        self.checkers = checkers
+        self.default_checker = default_checker
+        self.batch_size = batch_size
+
+    def _page(self, favorites: bool, after: Optional[Tuple], size: int) -> List:
+        is_favorite = exists().where(Favorite.job_listing_id == JobListing.id)
+        crawled_at = func.coalesce(JobListing.crawled_at, NEVER_CRAWLED)
+        stmt = (
+            select(
+                JobListing.id,
+                JobListing.url,
+                JobListing.external_id,
+                crawled_at.label("crawled_at"),
+                JobSource.name.label("source"),
+            )
+            .join(JobSource, JobListing.source_id == JobSource.id)
+            .where(
+                JobListing.is_expired.is_not(True),
+                is_favorite if favorites else ~is_favorite,
+            )
+            .order_by(crawled_at, JobListing.id)
+            .limit(size)
+        )
+        if after is not None:
+            last_crawled_at, last_id = after
+            stmt = stmt.where(
+                or_(
+                    crawled_at > last_crawled_at,
+                    and_(crawled_at == last_crawled_at, JobListing.id > last_id),
+                )
+            )
+        rows = self.db.execute(stmt).all()
+        # Don't hold a transaction open while the batch is checked
+        self.db.rollback()
+        return rows
+
+    def pending(self, limit: Optional[int] = None) -> Iterator[List]:
+        """Open jobs to check in batches, favorites first, then oldest first."""
+        remaining = limit
+        for favorites in (True, False):
+            after = None
+            while remaining is None or remaining > 0:
+                size = (
+                    self.batch_size
+                    if remaining is None
+                    else min(self.batch_size, remaining)
+                )
+                rows = self._page(favorites, after, size)
+                if not rows:
+                    break
+                yield rows
+                after = (rows[-1].crawled_at, rows[-1].id)
+                if remaining is not None:
+                    remaining -= len(rows)
+
+    def check(self, rows: List) -> List[int]:
+        """Return the ids of the expired jobs among rows."""
+        groups: Dict[str, List] = {}
+        for row in rows:
+            groups.setdefault(row.source, []).append(row)
+
+        def check_group(source: str, group: List) -> List[int]:
+            checker = self.checkers.get(source, self.default_checker)
+            if checker is None:
+                return []
+            try:
+                results = checker.check(group)
+            except Exception as e:
+                logger.error(f"Error checking {len(group)} {source} jobs: {e}")
+                return []
+            return [row.id for row, expired in zip(group, results) if expired]
+
+        with ThreadPoolExecutor(max_workers=max(1, len(groups))) as executor:
+            futures = [
+                executor.submit(check_group, source, group)
+                for source, group in groups.items()
+            ]
+            return [job_id for future in futures for job_id in future.result()]
+
+    def mark_expired(self, job_ids: List[int]) -> int:
+        if not job_ids:
+            return 0
+        stmt = (
+            update(JobListing)
+            .where(JobListing.id.in_(job_ids), JobListing.is_expired.is_not(True))
+            .values(is_expired=True)
+        )
+        try:
+            updated = self.db.execute(stmt).rowcount
+            if updated:
+                bump_data_version(self.db)
+            self.db.commit()
+            return updated
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error marking {len(job_ids)} jobs expired: {e}")
+            return 0
+
+    def run(
+        self, limit: Optional[int] = None, dry_run: bool = False
+    ) -> Tuple[int, int]:
+        """Check up to limit open jobs, returning (checked, expired)."""
+        checked, expired = 0, 0
+        with tqdm(total=limit, unit="jobs") as progress:
+            for rows in self.pending(limit):
+                job_ids = self.check(rows)
+                expired += len(job_ids) if dry_run else self.mark_expired(job_ids)
+                checked += len(rows)
+                progress.update(len(rows))
+        logger.info(f"Checked {checked} jobs, {expired} expired")
+        return checked, expired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mark stored jobs whose listings have closed as expired"
+    )
+    parser.add_argument("--limit", type=int, help="Check at most this many jobs")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would be marked"
+    )
+    args = parser.parse_args()
+    ExpirationService(session, batch_size=args.batch_size).run(args.limit, args.dry_run)
@@ -0,0 +1,138 @@
+import asyncio
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import cloudscraper
+
+from src.http_cache import HttpCache
+from src.logger import logger
+from src.rate_limiter import RateLimiter, rate_limiter
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class FetchError(Exception):
+    """A page could not be fetched, as opposed to having no results."""
+
+
+class AsyncFetcher:
+    """Fetch many URLs concurrently through a blocking cloudscraper session.
+
+    Each host gets at most ``max_concurrency`` requests in flight, and request
+    starts are paced by the shared per-domain rate limiter, so the pacing stays
+    polite while the network waits overlap.
+    """
+
+    def __init__(
+        self,
+        scraper: cloudscraper.CloudScraper,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        limiter: RateLimiter = rate_limiter,
+        cache: Optional[HttpCache] = None,
+    ):
+        self.scraper = scraper
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.limiter = limiter
+        self.cache = cache
+
+    def fetch(self, url: str, use_cache: bool = False, max_age: Optional[float] = None):
+        return self.fetch_all([url], use_cache, max_age)[0]
+
+    def fetch_all(
+        self,
+        urls: List[str],
+        use_cache: bool = False,
+        max_age: Optional[float] = None,
+        method: str = "GET",
+    ) -> List:
+        """Fetch urls concurrently, returning responses (or None) in order.
+
+        With use_cache, responses younger than max_age (the cache TTL by
+        default) are served from disk and older ones are revalidated with a
+        conditional request. Only GET responses are cached.
+        """
+        if not urls:
+            return []
+        cache = self.cache if use_cache and method == "GET" else None
+        responses = asyncio.run(self._fetch_all(urls, cache, max_age, method))
+        if cache:
+            cache.maybe_evict()
+        return responses
+
+    async def _fetch_all(
+        self,
+        urls: List[str],
+        cache: Optional[HttpCache],
+        max_age: Optional[float],
+        method: str = "GET",
+    ) -> List:
+        # asyncio primitives are bound to the running loop, so build them per call
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+        for url in urls:
+            host = urlparse(url).netloc
+            if host not in semaphores:
+                semaphores[host] = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(url):
+            async with semaphores[urlparse(url).netloc]:
+                return await self._fetch_cached(url, cache, max_age, method)
+
+        return await asyncio.gather(*(run(url) for url in urls))
+
+    async def _request(
+        self, url: str, headers: Optional[Dict] = None, method: str = "GET"
+    ):
+        try:
+            return await asyncio.to_thread(
+                self.scraper.request, method, url, headers=headers
+            )
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+
+    async def _fetch_cached(
+        self,
+        url: str,
+        cache: Optional[HttpCache],
+        max_age: Optional[float],
+        method: str = "GET",
+    ) -> Optional:
+        if cache is None:
+            return await self._fetch(url, method=method)
+        entry = cache.lookup(url)
+        if entry and cache.is_fresh(entry, max_age):
+            cached = cache.response(entry)
+            if cached is not None:
+                return cached
+        response = await self._fetch(url, cache.conditional_headers(entry))
+        if response is None:
+            return None
+        if response.status_code == 304 and entry:
+            cached = cache.revalidated(entry)
+            if cached is not None:
+                return cached
+            # The body was evicted meanwhile, so fetch it in full
+            response = await self._fetch(url)
+            if response is None:
+                return None
+        if response.status_code == 200:
+            cache.store(url, response)
+        return response
+
+    async def _fetch(
+        self, url: str, headers: Optional[Dict] = None, method: str = "GET"
+    ) -> Optional:
+        response = None
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(url)
+            response = await self._request(url, headers, method)
+            if response is None:
+                return None
+            if response.status_code not in THROTTLE_STATUS_CODES:
+                self.limiter.on_success(url)
+                return response
+            self.limiter.on_throttle(url, attempt, response.headers.get("Retry-After"))
+        logger.error(f"Giving up on {url} after {self.max_retries} retries")
+        return response
@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.logger import logger
+from src.models import CrawlFrontierEntry
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+# Given up on after max_attempts failures, so it can't block the next cycle
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+MAX_ATTEMPTS = 3
+# Older unfinished cycles are dropped rather than resumed, so a scheduled run
+# never just retries the leftovers of the previous day
+MAX_CYCLE_AGE = timedelta(hours=12)
+
+
+class CrawlFrontier:
+    """Durable per-query pagination state, so an interrupted crawl can resume.
+
+    A run starts fresh once every query of the previous run is finished or the
+    previous run started more than ``max_age`` ago; otherwise it picks up each
+    unfinished query after its last saved page. A query that fails
+    ``max_attempts`` times in a row without saving a page is given up on.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        source: str,
+        max_attempts: int = MAX_ATTEMPTS,
+        max_age: timedelta = MAX_CYCLE_AGE,
+    ):
+        self.db = db
+        self.source = source
+        self.max_attempts = max_attempts
+        self.max_age = max_age
+
+    def _entry(self, query: str) -> Optional[CrawlFrontierEntry]:
+        return (
+            self.db.query(CrawlFrontierEntry)
+            .filter_by(source=self.source, query=query)
+            .first()
+        )
+
+    def _commit(self):
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving crawl frontier: {e}")
+
+    def start(self, queries: List[str]):
+        queries = list(queries)
+        now = datetime.now()
+        entries = self.db.query(CrawlFrontierEntry).filter_by(source=self.source).all()
+        # Queries no longer configured would otherwise block the reset for good
+        stale = [entry for entry in entries if entry.query not in queries]
+        entries = [entry for entry in entries if entry.query in queries]
+        cycle_started_at = min(
+            (entry.cycle_started_at or datetime.min for entry in entries),
+            default=now,
+        )
+        if entries and (
+            all(entry.status in FINISHED for entry in entries)
+            or now - cycle_started_at > self.max_age
+        ):
+            stale += entries
+            entries = []
+            cycle_started_at = now
+        for entry in stale:
+            self.db.delete(entry)
+        # Delete before re-adding the same queries, or the unique key clashes
+        self.db.flush()
+        if entries:
+            unfinished = [
+                entry.query for entry in entries if entry.status not in FINISHED
+            ]
+            logger.info(f"Resuming {self.source} crawl for {unfinished}")
+
+        known_queries = {entry.query for entry in entries}
+        for query in queries:
+            if query not in known_queries:
+                self.db.add(
+                    CrawlFrontierEntry(
+                        source=self.source,
+                        query=query,
+                        status=PENDING,
+                        attempts=0,
+                        cycle_started_at=cycle_started_at,
+                    )
+                )
+        self._commit()
+
+    def is_done(self, query: str) -> bool:
+        entry = self._entry(query)
+        return entry is not None and entry.status == DONE
+
+    def is_finished(self, query: str) -> bool:
+        """Done, or given up on for this cycle."""
+        entry = self._entry(query)
+        return entry is not None and entry.status in FINISHED
+
+    def last_page(self, query: str, default: int) -> int:
+        entry = self._entry(query)
+        if entry is None or entry.last_page is None:
+            return default
+        return entry.last_page
+
+    def mark_in_flight(self, query: str, url: str):
+        entry = self._entry(query)
+        if entry is None:
+            return
+        entry.status = IN_FLIGHT
+        entry.url = url
+        self._commit()
+
+    def mark_page_done(self, query: str, page: int):
+        entry = self._entry(query)
+        if entry is None:
+            return
+        entry.last_page = page
+        entry.attempts = 0
+        self._commit()
+
+    def mark_done(self, query: str):
+        entry = self._entry(query)
+        if entry is None:
+            return
+        entry.status = DONE
+        self._commit()
+
+    def mark_failed(self, query: str):
+        """Keep the query in flight for the next run, up to max_attempts times."""
+        # The failure may have left the session in a failed transaction
+        self.db.rollback()
+        entry = self._entry(query)
+        if entry is None:
+            return
+        entry.attempts = (entry.attempts or 0) + 1
+        if entry.attempts >= self.max_attempts:
+            entry.status = FAILED
+            logger.warning(
+                f"Giving up on {self.source} query {query!r} "
+                f"after {entry.attempts} failed attempts"
+            )
+        self._commit()
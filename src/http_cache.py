@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Bodies written this recently may still be waiting for their index entry
+ORPHAN_GRACE_SECONDS = 300
+
+
+class CachedResponse:
+    """The subset of a requests.Response the managers rely on."""
+
+    def __init__(self, url: str, text: str, headers: Dict):
+        self.url = url
+        self.status_code = 200
+        self.text = text
+        self.headers = headers
+        self.from_cache = True
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class HttpCache:
+    """On-disk response cache for detail pages.
+
+    Bodies are gzip-compressed and stored by the SHA-256 of their content, so
+    identical pages share one file. A small JSON entry per URL keeps the
+    validators (ETag/Last-Modified) used for conditional requests. Entries not
+    revalidated within ``retention`` seconds are dropped, then the least
+    recently used ones until the bodies fit in ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str = "./assets/http_cache",
+        ttl: float = 24 * 3600,
+        retention: float = 30 * 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        evict_interval: float = 300,
+    ):
+        self.directory = Path(directory)
+        self.bodies_dir = self.directory / "bodies"
+        self.index_dir = self.directory / "index"
+        self.ttl = ttl
+        self.retention = retention
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._last_evict = 0.0
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, url: str) -> Path:
+        return self.index_dir / f"{_sha256(url.encode())}.json"
+
+    def _body_path(self, digest: str) -> Path:
+        return self.bodies_dir / f"{digest}.gz"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        try:
+            entry = json.loads(self._entry_path(url).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not self._body_path(entry["digest"]).exists():
+            return None
+        return entry
+
+    def is_fresh(self, entry: Dict, max_age: Optional[float] = None) -> bool:
+        max_age = self.ttl if max_age is None else max_age
+        return time.time() - entry["stored_at"] < max_age
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _read_body(self, digest: str) -> Optional[str]:
+        try:
+            return gzip.decompress(self._body_path(digest).read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            # Evicted meanwhile by another cache sharing the directory
+            return None
+
+    def response(self, entry: Dict) -> Optional[CachedResponse]:
+        """The cached response, or None if its body is gone (a cache miss)."""
+        body = self._read_body(entry["digest"])
+        if body is None:
+            return None
+        self._write_entry(entry["url"], dict(entry, accessed_at=time.time()))
+        return CachedResponse(entry["url"], body, entry["headers"])
+
+    def revalidated(self, entry: Dict) -> Optional[CachedResponse]:
+        """Refresh an entry after the server answered 304 Not Modified."""
+        entry = dict(entry, stored_at=time.time())
+        self._write_entry(entry["url"], entry)
+        return self.response(entry)
+
+    def store(self, url: str, response):
+        body = response.text.encode("utf-8")
+        digest = _sha256(body)
+        body_path = self._body_path(digest)
+        try:
+            # A fresh mtime keeps a concurrent eviction from dropping the body
+            os.utime(body_path)
+        except FileNotFoundError:
+            _write_atomic(body_path, gzip.compress(body))
+        now = time.time()
+        headers = {
+            key: response.headers[key]
+            for key in ("Content-Type", "ETag", "Last-Modified")
+            if key in response.headers
+        }
+        self._write_entry(
+            url,
+            {
+                "url": url,
+                "digest": digest,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "headers": headers,
+                "stored_at": now,
+                "accessed_at": now,
+            },
+        )
+
+    def _write_entry(self, url: str, entry: Dict):
+        _write_atomic(self._entry_path(url), json.dumps(entry).encode())
+
+    def get_cached(self, url: str) -> Optional[str]:
+        """Return the cached body of a URL, e.g. to replay a parser offline."""
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        return self._read_body(entry["digest"])
+
+    def entries(self) -> Iterator[Tuple[str, str]]:
+        for entry_path in self.index_dir.glob("*.json"):
+            try:
+                url = json.loads(entry_path.read_text())["url"]
+            except (json.JSONDecodeError, KeyError):
+                continue
+            body = self.get_cached(url)
+            if body is not None:
+                yield url, body
+
+    def maybe_evict(self):
+        # Eviction scans the whole index, so run it at most every evict_interval
+        if time.monotonic() - self._last_evict >= self.evict_interval:
+            self.evict()
+
+    @contextmanager
+    def _evict_lock(self):
+        """Lets one cache at a time, across threads and processes, evict."""
+        if fcntl is None:
+            yield True
+            return
+        with open(self.directory / "evict.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def evict(self):
+        self._last_evict = time.monotonic()
+        with self._evict_lock() as locked:
+            if locked:
+                self._evict()
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        for entry_path in self.index_dir.glob("*.json"):
+            try:
+                entry = json.loads(entry_path.read_text())
+            except json.JSONDecodeError:
+                entry_path.unlink(missing_ok=True)
+                continue
+            if now - entry["stored_at"] > self.retention:
+                entry_path.unlink(missing_ok=True)
+                continue
+            entries.append((entry_path, entry))
+
+        body_sizes, body_mtimes = {}, {}
+        for path in self.bodies_dir.glob("*.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            digest = path.stem.split(".")[0]
+            body_sizes[digest] = stat.st_size
+            body_mtimes[digest] = stat.st_mtime
+        referenced = {}
+        for entry_path, entry in entries:
+            referenced.setdefault(entry["digest"], []).append(entry_path)
+        total = sum(body_sizes.get(digest, 0) for digest in referenced)
+
+        # Least recently used entries go first until the bodies fit
+        entries.sort(key=lambda item: item[1]["accessed_at"])
+        evicted = 0
+        for entry_path, entry in entries:
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            evicted += 1
+            paths = referenced[entry["digest"]]
+            paths.remove(entry_path)
+            if not paths:
+                total -= body_sizes.get(entry["digest"], 0)
+
+        for digest in body_sizes:
+            if digest in referenced:
+                if referenced[digest]:
+                    continue
+            elif now - body_mtimes[digest] <= ORPHAN_GRACE_SECONDS:
+                # Never referenced yet: may belong to a store() still in progress
+                continue
+            self._body_path(digest).unlink(missing_ok=True)
+        if evicted:
+            logger.info(f"Evicted {evicted} cached responses")
@@ -1,26 +1,30 @@
-import random
 import re
-import time
 import urllib
 import urllib.parse
-from datetime import date
 from typing import Dict, List
 
 import cloudscraper
-from bs4 import BeautifulSoup
 from sqlalchemy import or_
 from tqdm import tqdm
 
+from src.blacklist import JobBlacklist
+from src.fetcher import AsyncFetcher, FetchError
+from src.frontier import CrawlFrontier
+from src.http_cache import HttpCache
 from src.job import Job
+from src.job_index import KnownJobIndex
 from src.logger import logger
 from src.models import JobListing, JobSource, session
-from src.regex_utils import generate_regex_patterns_for_blacklisting
-from src.utils import standardize_location
+from src.parsers import get_parser
+from src.persistence import bulk_insert_jobs, bump_data_version, job_to_row
 
 
 class ITViecJobManager:
-    def __init__(self, scraper: cloudscraper.CloudScraper):
+    def __init__(self, scraper: cloudscraper.CloudScraper, db_session=None):
         self.scraper = scraper
+        self.session = db_session or session
+        self.fetcher = AsyncFetcher(scraper, max_concurrency=4, cache=HttpCache())
+        self.parser = get_parser()
 
     def set_parameters(self, parameters: Dict):
         logger.info("Setting parameters")
@@ -28,97 +32,83 @@ class ITViecJobManager:
         self.locations: List = parameters.get("locations", [])
         self.title_blacklist: List = parameters.get("title_blacklist", [])
         self.company_blacklist: List = parameters.get("company_blacklist", [])
-
-        self.title_blacklist_patterns = generate_regex_patterns_for_blacklisting(
-            self.title_blacklist
-        )
-        self.company_blacklist_patterns = generate_regex_patterns_for_blacklisting(
-            self.company_blacklist
-        )
+        self.blacklist = JobBlacklist.from_parameters(parameters)
+        self.parser = get_parser(parameters.get("parser", "lxml"))
 
     def retrieve_job_details(self):
         job_records = (
-            session.query(JobListing)
+            self.session.query(JobListing)
             .join(JobSource)
             .filter(JobSource.name == "ITViec")
             .filter(or_(JobListing.description == "", JobListing.description.is_(None)))
             .all()
         )
-        for job_record in tqdm(job_records):
-            job = Job(link=job_record.url)
-            self._get_job_description(job)
-            try:
+        batch_size = 50
+        for start in tqdm(range(0, len(job_records), batch_size)):
+            batch = job_records[start : start + batch_size]
+            responses = self.fetcher.fetch_all(
+                [record.url for record in batch], use_cache=True
+            )
+            for job_record, job_response in zip(batch, responses):
+                job = Job(link=job_record.url)
+                self._parse_job_description(job, job_response)
                 job_record.description = job.description
-                session.commit()
+            try:
+                bump_data_version(self.session)
+                self.session.commit()
             except Exception as e:
                 logger.error(e)
-                session.rollback()
+                self.session.rollback()
 
     def collecting_data(self):
-        job_list: List[Job] = []
+        job_source = self.session.query(JobSource).filter_by(name="ITViec").first()
+        if not job_source:
+            job_source = JobSource(name="ITViec")
+            try:
+                self.session.add(job_source)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"Error when creating job source ITViec.")
+
+        known_jobs = KnownJobIndex.load(self.session, job_source)
+        get_job_id = lambda job: job.job_key
+        frontier = CrawlFrontier(self.session, "ITViec")
+        frontier.start(self.positions)
+        job_count = 0
+        # Unlike LinkedIn, listings aren't sorted by date, so there's no
+        # incremental early stop: a pinned job that is already stored says
+        # nothing about the pages after it
         for position in self.positions:
+            if frontier.is_finished(position):
+                continue
             try:
-                job_page_number = 0
+                job_page_number = frontier.last_page(position, default=0)
                 is_last_page = False
                 while not is_last_page:
                     job_page_number += 1
                     next_job_page_url = self.next_job_page(position, job_page_number)
+                    frontier.mark_in_flight(position, next_job_page_url)
                     job_sub_list, is_last_page = self.read_jobs(next_job_page_url)
-                    job_sub_list = [
-                        job
-                        for job in job_sub_list
-                        if not self.is_blacklisted(job.company, job.title)
-                    ]
-                    job_list.extend(job_sub_list)
+                    job_sub_list = self.blacklist.filter(job_sub_list)
+                    new_jobs = known_jobs.new_jobs(job_sub_list, get_job_id)
+                    known_jobs.add(get_job_id(job) for job in new_jobs)
+                    self.save_jobs_to_db(new_jobs, job_source)
+                    frontier.mark_page_done(position, job_page_number)
+                    job_count += len(new_jobs)
+                frontier.mark_done(position)
             except Exception as e:
+                # Left in flight, so the next run resumes at the failed page
                 logger.error(e)
-                pass
-
-        logger.info(f"Number of extracted jobs: {len(job_list)}")
-
-        # Insert into db
-        job_source = session.query(JobSource).filter_by(name="ITViec").first()
-        if not job_source:
-            job_source = JobSource(name="ITViec")
-            try:
-                session.add(job_source)
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error when creating job source ITViec.")
+                frontier.mark_failed(position)
 
-        for job in tqdm(job_list):
-            self.save_job_to_db(job, job_source)
+        logger.info(f"Number of extracted jobs: {job_count}")
+        return job_count
 
-    def save_job_to_db(self, job: Job, job_source: JobSource):
-        try:
-            itviec_job_id = job.job_key
-            existing_job = (
-                session.query(JobListing).filter_by(external_id=itviec_job_id).first()
-            )
-            if existing_job:
-                return
-
-            job_listing = JobListing(
-                source_id=job_source.id,
-                external_id=itviec_job_id,
-                title=job.title,
-                company=job.company,
-                location=standardize_location(job.location),
-                description=job.description,
-                url=job.link,
-                crawled_at=date.today(),
-                is_expired=False,
-            )
-            session.add(job_listing)
-            try:
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error saving job: {e}")
-        except Exception as e:
-            logger.error(e)
-            return
+    def save_jobs_to_db(self, job_list: List[Job], job_source: JobSource):
+        rows = [job_to_row(job, job_source.id, job.job_key) for job in job_list]
+        inserted, skipped = bulk_insert_jobs(self.session, rows)
+        logger.info(f"Saved {inserted} new jobs, skipped {skipped} existing jobs.")
 
     def next_job_page(self, position, job_page):
         encoded_position = urllib.parse.quote(re.sub(r"\s+", "-", position.strip()))
@@ -126,73 +116,25 @@ class ITViecJobManager:
 
     def read_jobs(self, page_url):
         logger.info(page_url)
-        time.sleep(random.uniform(7, 10))
-        page_response = self.scraper.get(page_url)
-        retry_cnt = 5
-        while page_response.status_code == 429 and retry_cnt:
-            logger.info(f"Retrying...")
-            time.sleep(random.uniform(7, 10))
-            page_response = self.scraper.get(page_url)
-            retry_cnt -= 1
-        if page_response.status_code != 200:
-            logger.error(f"Error: {page_response.status_code}")
-            return
-        page_soup = BeautifulSoup(page_response.text, "lxml")
-
-        # Find paginate search jobs
-        is_last_page = True
-        paginate_search_jobs = page_soup.find(
-            "div", class_=lambda x: x and "pagination-search-jobs" in x
-        )
-        if paginate_search_jobs:
-            page_next = paginate_search_jobs.find("div", class_="page next")
-            if page_next:
-                is_last_page = False
-
-        jobs = page_soup.find_all("div", class_=lambda x: x and "job-card" in x)
-        job_list: List[Job] = []
-        for job_element in jobs:
-            job = Job()
-            job.title = job_element.find("h3", class_="imt-3").text.strip()
-            job.link = job_element.find("h3", class_="imt-3").get("data-url")
-            job.company = job_element.find(
-                "a", class_="text-rich-grey", target="_blank"
-            ).text.strip()
-            job.job_key = job_element.get("data-job-key")
-            job.location = job_element.find(
-                "div",
-                class_="text-rich-grey text-truncate text-nowrap stretched-link position-relative",
-            ).text.strip()
-            job_list.append(job)
+        page_response = self.fetcher.fetch(page_url)
+        if page_response is None or page_response.status_code != 200:
+            raise FetchError(
+                f"Error fetching {page_url}: "
+                f"HTTP {getattr(page_response, 'status_code', None)}"
+            )
+        return self.parse_job_list(page_response.text)
 
-        return job_list, is_last_page
+    def parse_job_list(self, page_html: str):
+        return self.parser.itviec_job_list(page_html)
 
     def _get_job_description(self, job: Job):
-        time.sleep(random.uniform(7, 10))
-        job_response = self.scraper.get(job.link)
-        retry_cnt = 5
-        while job_response.status_code == 429 and retry_cnt:
-            logger.info("Retrying..")
-            time.sleep(random.uniform(7, 10))
-            job_response = self.scraper.get(job.link)
-            retry_cnt -= 1
-        if job_response.status_code != 200:
-            logger.error(f"Error: {job_response.status_code}")
-            return
-        job_soup = BeautifulSoup(job_response.text, "lxml")
-        job_content_section = job_soup.find(
-            "section", class_=lambda x: x and "job-content" in x
-        )
-        job.description = job_content_section.text.strip()
+        job_response = self.fetcher.fetch(job.link, use_cache=True)
+        self._parse_job_description(job, job_response)
 
-    def is_blacklisted(self, company, job_title):
-        company_blacklisted = any(
-            re.search(pattern, company, re.IGNORECASE)
-            for pattern in self.company_blacklist_patterns
-        )
-        title_blacklisted = any(
-            re.search(pattern, job_title, re.IGNORECASE)
-            for pattern in self.title_blacklist_patterns
-        )
-        is_blacklisted = company_blacklisted or title_blacklisted
-        return is_blacklisted
+    def _parse_job_description(self, job: Job, job_response):
+        if job_response is None or job_response.status_code != 200:
+            logger.error(f"Error: {getattr(job_response, 'status_code', None)}")
+            return
+        job.description = self.parser.itviec_job_description(job_response.text)
+        if job.description is None:
+            logger.warning("Job description is missing")
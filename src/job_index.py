@@ -0,0 +1,38 @@
+from typing import Callable, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.job import Job
+from src.logger import logger
+from src.models import JobListing, JobSource
+
+
+class KnownJobIndex:
+    """In-memory set of the external IDs already stored for one job source."""
+
+    def __init__(self, external_ids: Iterable[str] = ()):
+        self.external_ids = set(external_ids)
+
+    @classmethod
+    def load(cls, db: Session, job_source: JobSource) -> "KnownJobIndex":
+        stmt = (
+            select(JobListing.external_id)
+            .where(JobListing.source_id == job_source.id)
+            .execution_options(yield_per=10000)
+        )
+        index = cls(db.execute(stmt).scalars())
+        logger.info(f"Loaded {len(index)} known {job_source.name} job IDs")
+        return index
+
+    def __contains__(self, external_id: str) -> bool:
+        return external_id in self.external_ids
+
+    def __len__(self) -> int:
+        return len(self.external_ids)
+
+    def add(self, external_ids: Iterable[str]):
+        self.external_ids.update(external_ids)
+
+    def new_jobs(self, job_list: List[Job], get_job_id: Callable[[Job], str]):
+        return [job for job in job_list if get_job_id(job) not in self]
@@ -1,3 +1,4 @@
+import copy
 import json
 import random
 import re
@@ -5,10 +6,10 @@ import time
 import traceback
 import urllib
 import urllib.parse
-from datetime import date
+from datetime import datetime, timedelta
 from itertools import product
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
 from selenium import webdriver
@@ -16,19 +17,32 @@ from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
-from sqlalchemy import or_
+from sqlalchemy import or_, update
 from tqdm import tqdm
 
+from src.blacklist import JobBlacklist
+from src.driver_pool import DriverPool
+from src.expiration import ExpirationService
+from src.frontier import CrawlFrontier
 from src.job import Job
+from src.job_index import KnownJobIndex
+from src.linkedin_http import LinkedInHttpFetcher
 from src.logger import logger
-from src.models import JobListing, JobSource, session
-from src.regex_utils import generate_regex_patterns_for_blacklisting
-from src.utils import scroll_slow, standardize_location
+from src.models import JobListing, JobSource, Session, session
+from src.persistence import bulk_insert_jobs, bump_data_version, job_to_row
+from src.rate_limiter import rate_limiter
+from src.utils import scroll_slow
+from src.watermark import CrawlWatermarks
+
+
+class NoMoreJobs(Exception):
+    """The search has run out of result pages."""
 
 
 class JobManager:
-    def __init__(self, driver: webdriver.Chrome):
+    def __init__(self, driver: webdriver.Chrome, db_session=None):
         self.driver = driver
+        self.session = db_session or session
 
     def set_parameters(self, parameters: Dict):
         logger.info("Setting parameters")
@@ -36,7 +50,10 @@ class JobManager:
         self.locations: List = parameters.get("locations", [])
         self.title_blacklist: List = parameters.get("title_blacklist", [])
         self.company_blacklist: List = parameters.get("company_blacklist", [])
+        self.blacklist = JobBlacklist.from_parameters(parameters)
         self.base_search_url = self.get_base_search_url(parameters)
+        self.incremental: bool = parameters.get("incremental", False)
+        self.fetch_mode: str = parameters.get("linkedin_fetch_mode", "http")
 
     def get_base_search_url(self, parameters: Dict):
         url_parts = []
@@ -59,61 +76,182 @@ class JobManager:
         full_url = f"?{base_url}{date_param}"
         return full_url
 
-    def retrieve_job_description(self):
+    def incremental_search_url(self, window: Optional[timedelta]) -> str:
+        """Narrow the f_TPR date filter to the time since the search last ran."""
+        if window is None:
+            return self.base_search_url
+        seconds = int(window.total_seconds())
+        current = re.search(r"&f_TPR=r(\d+)", self.base_search_url)
+        if current and int(current.group(1)) <= seconds:
+            return self.base_search_url
+        base_url = re.sub(r"&f_TPR=r\d+", "", self.base_search_url)
+        return f"{base_url}&f_TPR=r{seconds}"
+
+    def _worker(self, driver: webdriver.Chrome, db_session=None) -> "JobManager":
+        # Each pool task gets its own driver, and its own DB session if it
+        # needs one; the caller closes that session
+        worker = copy.copy(self)
+        worker.driver = driver
+        worker.session = db_session
+        return worker
+
+    def retrieve_job_description(self, pool: Optional[DriverPool] = None):
+        pool = pool or DriverPool([self.driver])
         job_records = (
-            session.query(JobListing)
+            self.session.query(JobListing.id, JobListing.url)
             .join(JobSource)
             .filter(JobSource.name == "LinkedIn")
             .filter(or_(JobListing.description == "", JobListing.description.is_(None)))
             .all()
         )
-        for job_record in tqdm(job_records):
-            job = Job(link=job_record.url)
-            job_description = self._get_job_description(job)
-            try:
-                job_record.description = job_description
-                session.commit()
-            except Exception as e:
-                logger.error(e)
-                session.rollback()
+        if self.fetch_mode == "http":
+            job_records = self._retrieve_job_description_http(job_records)
+
+        def fetch_description(driver, job_record):
+            return self._worker(driver)._get_job_description(Job(link=job_record.url))
+
+        updates = []
+        for job_record, job_description in tqdm(
+            pool.map(fetch_description, job_records), total=len(job_records)
+        ):
+            updates.append({"id": job_record.id, "description": job_description})
+            if len(updates) >= 50:
+                self._update_descriptions(updates)
+                updates = []
+        self._update_descriptions(updates)
+
+    def _retrieve_job_description_http(self, job_records: List) -> List:
+        # Returns the records that still need the browser
+        fetcher = LinkedInHttpFetcher.from_driver(self.driver)
+        remaining = []
+        batch_size = 50
+        for start in tqdm(range(0, len(job_records), batch_size)):
+            batch = job_records[start : start + batch_size]
+            descriptions = fetcher.fetch_descriptions(
+                [self.get_job_id(job_record.url) for job_record in batch]
+            )
+            updates = []
+            for job_record, job_description in zip(batch, descriptions):
+                if job_description:
+                    updates.append(
+                        {"id": job_record.id, "description": job_description}
+                    )
+                else:
+                    remaining.append(job_record)
+            self._update_descriptions(updates)
+        logger.info(
+            f"Fetched {len(job_records) - len(remaining)} descriptions over HTTP, "
+            f"{len(remaining)} left for the browser"
+        )
+        return remaining
 
-    def collecting_data(self):
+    def _update_descriptions(self, updates: List[Dict]):
+        if not updates:
+            return
+        try:
+            self.session.execute(update(JobListing), updates)
+            bump_data_version(self.session)
+            self.session.commit()
+        except Exception as e:
+            logger.error(e)
+            self.session.rollback()
+
+    def collecting_data(self, pool: Optional[DriverPool] = None):
+        pool = pool or DriverPool([self.driver])
         # Insert into db
-        job_source = session.query(JobSource).filter_by(name="LinkedIn").first()
+        job_source = self.session.query(JobSource).filter_by(name="LinkedIn").first()
         if not job_source:
             job_source = JobSource(name="LinkedIn")
             try:
-                session.add(job_source)
-                session.commit()
+                self.session.add(job_source)
+                self.session.commit()
             except Exception as e:
-                session.rollback()
+                self.session.rollback()
                 logger.error(f"Error when creating job source LinkedIn.")
 
-        searches = list(product(self.positions, self.locations))
-        job_count = 0
+        known_jobs = KnownJobIndex.load(self.session, job_source)
+        job_source_id = job_source.id
+        frontier = CrawlFrontier(self.session, "LinkedIn")
+        frontier.start([self.search_key(*search) for search in self.searches()])
+        searches = [
+            search
+            for search in self.searches()
+            if not frontier.is_finished(self.search_key(*search))
+        ]
 
-        for position, location in searches:
+        def crawl_search(driver, search):
+            worker = self._worker(driver, Session())
             try:
-                location_url = "&location=" + location
-                job_page_number = -1
-                while True:
-                    job_page_number += 1
-                    self.next_job_page(position, location_url, job_page_number)
-                    time.sleep(random.uniform(2, 4))
-                    job_list: List[Job] = self.read_jobs(is_scroll=True)
-                    job_list = [
-                        job
-                        for job in tqdm(job_list)
-                        if not self.is_blacklisted(job.company, job.title)
-                    ]
-                    for job in tqdm(job_list):
-                        self.save_job_to_db(job, job_source, description=False)
-                    job_count += len(job_list)
-            except Exception as e:
-                logger.error(e)
-                pass
+                return worker.crawl_search(*search, job_source_id, known_jobs)
+            finally:
+                worker.session.close()
 
+        job_count = sum(count for _, count in pool.map(crawl_search, searches))
         logger.info(f"Number of extracted jobs: {job_count}")
+        return job_count
+
+    def crawl_search(
+        self,
+        position: str,
+        location: str,
+        job_source_id: int,
+        known_jobs: KnownJobIndex,
+    ) -> int:
+        job_source = self.session.get(JobSource, job_source_id)
+        frontier = CrawlFrontier(self.session, "LinkedIn")
+        watermarks = CrawlWatermarks(self.session, "LinkedIn")
+        query = self.search_key(position, location)
+        run_started_at = datetime.now()
+        newest_job_id = None
+        if self.incremental:
+            # Runs on a per-search copy, so only this search is narrowed
+            self.base_search_url = self.incremental_search_url(watermarks.window(query))
+        job_count = 0
+        try:
+            location_url = "&location=" + location
+            job_page_number = frontier.last_page(query, default=-1)
+            while True:
+                job_page_number += 1
+                url = self.next_job_page(position, location_url, job_page_number)
+                frontier.mark_in_flight(query, url)
+                time.sleep(random.uniform(2, 4))
+                try:
+                    job_list: List[Job] = self.read_jobs(is_scroll=True)
+                except NoMoreJobs as e:
+                    logger.info(e)
+                    break
+                page_job_ids = [self.get_job_id(job.link or "") for job in job_list]
+                job_list = self.blacklist.filter(job_list)
+                new_jobs = known_jobs.new_jobs(
+                    job_list, lambda job: self.get_job_id(job.link or "")
+                )
+                if self.incremental and job_list and not new_jobs:
+                    # Results are sorted by date, so older pages are known too
+                    logger.info("All jobs on this page are already stored.")
+                    break
+                if job_page_number == 0 and new_jobs:
+                    newest_job_id = self.get_job_id(new_jobs[0].link)
+                self.save_jobs_to_db(new_jobs, job_source)
+                frontier.mark_page_done(query, job_page_number)
+                known_jobs.add(self.get_job_id(job.link) for job in new_jobs)
+                job_count += len(new_jobs)
+                if self.incremental and watermarks.crossed(query, page_job_ids):
+                    logger.info("Reached the newest job of the last run.")
+                    break
+            # Only a finished search may move the f_TPR window forward
+            watermarks.advance(query, newest_job_id, run_started_at)
+            frontier.mark_done(query)
+        except Exception as e:
+            # Left in flight, so the next run resumes at the failed page
+            logger.error(e)
+            frontier.mark_failed(query)
+        return job_count
+
+    def searches(self) -> List:
+        return list(product(self.positions, self.locations))
+
+    def search_key(self, position: str, location: str) -> str:
+        return f"{position}|{location}"
 
     def get_job_id(self, job_link: str):
         parsed_url = urlparse(job_link)
@@ -123,50 +261,22 @@ class JobManager:
             return job_id
         return ""
 
-    def save_job_to_db(
-        self, job: Job, job_source: JobSource, description: bool = False
-    ):
-        try:
-            if job.link is None:
-                return
-
-            linkedin_job_id = self.get_job_id(job.link)
-            existing_job = (
-                session.query(JobListing).filter_by(external_id=linkedin_job_id).first()
-            )
-            if existing_job:
-                return
-
-            if description:
-                job_description = self._get_job_description(job)
-                job.set_job_description(job_description)
-
-            job_listing = JobListing(
-                source_id=job_source.id,
-                external_id=linkedin_job_id,
-                title=job.title,
-                company=job.company,
-                location=standardize_location(job.location),
-                description=job.description,
-                url=job.link,
-                crawled_at=date.today(),
-                is_expired=False,
-            )
-            session.add(job_listing)
-            try:
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error saving job: {e}")
-        except Exception as e:
-            self.write_to_file(job, "failed")
-            return
+    def save_jobs_to_db(self, job_list: List[Job], job_source: JobSource):
+        rows = [
+            job_to_row(job, job_source.id, self.get_job_id(job.link))
+            for job in job_list
+            if job.link
+        ]
+        inserted, skipped = bulk_insert_jobs(self.session, rows)
+        logger.info(f"Saved {inserted} new jobs, skipped {skipped} existing jobs.")
 
     def next_job_page(self, position, location, job_page):
         encoded_position = urllib.parse.quote(position)
         url = f"https://www.linkedin.com/jobs/search/{self.base_search_url}&keywords={encoded_position}{location}&start={job_page*25}"
         logger.info(f"Current Job Page: {url}")
+        rate_limiter.wait(url)
         self.driver.get(url)
+        return url
 
     def read_jobs(self, is_scroll=False):
         try:
@@ -174,7 +284,7 @@ class JobManager:
                 By.CLASS_NAME, "jobs-search-two-pane__no-results-banner--expand"
             )
             if "No matching jobs found" in no_jobs_element.text:
-                raise Exception("No more jobs on this page")
+                raise NoMoreJobs("No more jobs on this page")
         except NoSuchElementException:
             pass
 
@@ -192,7 +302,7 @@ class JobManager:
             ".//li[contains(@class, 'scaffold-layout__list-item') and contains(@class, 'ember-view')]",
         )
         if not job_list_elements:
-            raise Exception("No job class elements found on page.")
+            raise NoMoreJobs("No job class elements found on page.")
         logger.info(f"Number of job in this page: {len(job_list_elements)}")
 
         job_list = [
@@ -250,6 +360,7 @@ class JobManager:
 
     def _get_job_description(self, job: Job) -> str:
         try:
+            rate_limiter.wait(job.link)
             self.driver.get(job.link)
         except Exception as e:
             logger.error(e)
@@ -309,44 +420,6 @@ class JobManager:
                 json.dump(existing_data, f, indent=4)
                 f.truncate()
 
-    def is_blacklisted(self, company, job_title):
-        company_blacklisted = any(
-            re.search(rf"\b{re.escape(pattern)}\b", company, re.IGNORECASE)
-            for pattern in self.company_blacklist
-        )
-        title_blacklisted = any(
-            re.search(rf"\b{re.escape(pattern)}\b", job_title, re.IGNORECASE)
-            for pattern in self.title_blacklist
-        )
-        is_blacklisted = company_blacklisted or title_blacklisted
-        if is_blacklisted:
-            logger.info(f"Blacklist: Job {job_title} at {company}.")
-        return is_blacklisted
-
-    def is_expired(self, job: Job):
-        try:
-            self.driver.get(job.link)
-        except Exception as e:
-            logger.error(e)
-            logger.info("Job Link is no longer available")
-            return True
-
-        try:
-            feedback_message = self.driver.find_element(
-                By.CLASS_NAME, "artdeco-inline-feedback__message"
-            )
-            logger.info("No longer accepting applications")
-            return True
-        except NoSuchElementException:
-            return False
-
     def validate_job_expirations(self):
-        job_records = session.query(JobListing).filter_by(is_expired=False).all()
-        for job_record in tqdm(job_records):
-            job = Job(link=job_record.url)
-            try:
-                job_record.is_expired = self.is_expired(job)
-                session.commit()
-            except Exception as e:
-                logger.error(e)
-                session.rollback()
+        # Checks every source over HTTP now, no browser needed
+        ExpirationService(self.session).run()
@@ -0,0 +1,50 @@
+from typing import Dict, List, Optional
+
+import cloudscraper
+from selenium import webdriver
+
+from src.fetcher import AsyncFetcher
+from src.logger import logger
+from src.parsers import get_parser
+
+GUEST_JOB_POSTING_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{}"
+
+
+class LinkedInHttpFetcher:
+    """Fetch LinkedIn job descriptions over plain HTTP instead of Selenium."""
+
+    def __init__(
+        self, cookies: List[Dict], user_agent: Optional[str] = None, parser=None
+    ):
+        self.parser = parser or get_parser()
+        self.scraper = cloudscraper.create_scraper()
+        if user_agent:
+            self.scraper.headers["User-Agent"] = user_agent
+        for cookie in cookies:
+            self.scraper.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        self.fetcher = AsyncFetcher(self.scraper, max_concurrency=4)
+
+    @classmethod
+    def from_driver(cls, driver: webdriver.Chrome) -> "LinkedInHttpFetcher":
+        user_agent = driver.execute_script("return navigator.userAgent")
+        return cls(driver.get_cookies(), user_agent)
+
+    def fetch_descriptions(self, job_ids: List[str]) -> List[Optional[str]]:
+        responses = self.fetcher.fetch_all(
+            [GUEST_JOB_POSTING_URL.format(job_id) for job_id in job_ids]
+        )
+        descriptions = []
+        for job_id, response in zip(job_ids, responses):
+            if response is None or response.status_code != 200:
+                logger.warning(
+                    f"Job {job_id}: HTTP {getattr(response, 'status_code', None)}"
+                )
+                descriptions.append(None)
+                continue
+            descriptions.append(self.parser.linkedin_job_description(response.text))
+        return descriptions
@@ -0,0 +1,141 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Canonical name -> extra aliases. The canonical name itself always matches, and
+# all matching ignores case and Vietnamese diacritics.
+LOCATION_ALIASES: Dict[str, List[str]] = {
+    "Hà Nội": ["Hanoi"],
+    "Hồ Chí Minh": ["HCM", "TP HCM", "TPHCM", "Sài Gòn", "Saigon", "Thủ Đức"],
+    "Đà Nẵng": ["Danang"],
+    "Hải Phòng": ["Haiphong"],
+    "Cần Thơ": [],
+    "An Giang": ["Long Xuyên"],
+    "Vũng Tàu": ["Bà Rịa"],
+    "Bắc Giang": [],
+    "Bắc Kạn": ["Bắc Cạn"],
+    "Bạc Liêu": [],
+    "Bắc Ninh": [],
+    "Bến Tre": [],
+    "Bình Định": ["Quy Nhơn"],
+    "Bình Dương": ["Thủ Dầu Một", "Dĩ An", "Thuận An"],
+    "Bình Phước": [],
+    "Bình Thuận": ["Phan Thiết"],
+    "Cà Mau": [],
+    "Cao Bằng": [],
+    "Đắk Lắk": ["Đắc Lắc", "Buôn Ma Thuột"],
+    "Đắk Nông": [],
+    "Điện Biên": [],
+    "Đồng Nai": ["Biên Hòa", "Biên Hoà"],
+    "Đồng Tháp": [],
+    "Gia Lai": ["Pleiku"],
+    "Hà Giang": [],
+    "Hà Nam": [],
+    "Hà Tĩnh": [],
+    "Hải Dương": [],
+    "Hậu Giang": [],
+    "Hòa Bình": ["Hoà Bình"],
+    "Hưng Yên": [],
+    "Khánh Hòa": ["Khánh Hoà", "Nha Trang"],
+    "Kiên Giang": ["Phú Quốc", "Rạch Giá"],
+    "Kon Tum": ["Kontum"],
+    "Lai Châu": [],
+    "Lâm Đồng": ["Đà Lạt", "Dalat"],
+    "Lạng Sơn": [],
+    "Lào Cai": [],
+    "Long An": [],
+    "Nam Định": [],
+    "Nghệ An": [],
+    "Ninh Bình": [],
+    "Ninh Thuận": [],
+    "Phú Thọ": ["Việt Trì"],
+    "Phú Yên": [],
+    "Quảng Bình": [],
+    "Quảng Nam": [],
+    "Quãng Ngãi": ["Quảng Ngãi"],
+    "Quảng Ninh": ["Hạ Long"],
+    "Quảng Trị": [],
+    "Sóc Trăng": [],
+    "Sơn La": [],
+    "Tây Ninh": [],
+    "Thái Bình": [],
+    "Thái Nguyên": [],
+    "Thanh Hóa": ["Thanh Hoá"],
+    "Huế": ["Thừa Thiên Huế"],
+    "Tiền Giang": ["Mỹ Tho"],
+    "Trà Vinh": [],
+    "Tuyên Quang": [],
+    "Vĩnh Long": [],
+    "Vĩnh Phúc": [],
+    "Yên Bái": [],
+}
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip Vietnamese diacritics: "Đà Nẵng" -> "da nang"."""
+    text = text.replace("đ", "d").replace("Đ", "d")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+
+class LocationNormalizer:
+    """Maps free-form location strings to canonical city/province names.
+
+    All aliases are folded and compiled into a single regex up front, and
+    results are memoized per raw string since the same values repeat across a
+    crawl.
+    """
+
+    def __init__(
+        self,
+        aliases: Dict[str, Iterable[str]] = LOCATION_ALIASES,
+        cache_size: int = 4096,
+    ):
+        self.index: Dict[str, str] = {}
+        for canonical, names in aliases.items():
+            for name in [canonical, *names]:
+                self.index[" ".join(fold(name).split())] = canonical
+        # Longest aliases first so "thua thien hue" wins over "hue"
+        alternatives = sorted(self.index, key=len, reverse=True)
+        self.pattern = re.compile(
+            r"\b(?:"
+            + "|".join(
+                r"[\W_]+".join(map(re.escape, alias.split())) for alias in alternatives
+            )
+            + r")\b"
+        )
+        self._normalize_all = lru_cache(maxsize=cache_size)(self._find_all)
+
+    def _find_all(self, location: str) -> Tuple[str, ...]:
+        found = []
+        for match in self.pattern.finditer(fold(location)):
+            alias = " ".join(re.split(r"[\W_]+", match.group(0)))
+            canonical = self.index[alias]
+            if canonical not in found:
+                found.append(canonical)
+        return tuple(found)
+
+    def normalize_all(self, location: Optional[str]) -> List[str]:
+        """Every canonical location in a multi-city string, in order."""
+        if not location:
+            return []
+        return list(self._normalize_all(location))
+
+    def normalize(self, location: Optional[str]) -> Optional[str]:
+        """The first canonical location found, or the input if none is known."""
+        if location is None:
+            return None
+        found = self._normalize_all(location)
+        return found[0] if found else location
+
+    def normalize_many(self, locations: Iterable[Optional[str]]) -> List[Optional[str]]:
+        return [self.normalize(location) for location in locations]
+
+    def cache_info(self):
+        return self._normalize_all.cache_info()
+
+
+location_normalizer = LocationNormalizer()
@@ -2,15 +2,18 @@ import os
 
 from dotenv import load_dotenv
 from sqlalchemy import (
+    DDL,
     Boolean,
     Column,
     Date,
+    DateTime,
     ForeignKey,
     Integer,
     String,
     Text,
     UniqueConstraint,
     create_engine,
+    event,
     func,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
@@ -66,6 +69,99 @@ class Favorite(Base):
     __table_args__ = (UniqueConstraint("job_listing_id", name="uq_favorite_job"),)
 
 
+class CrawlFrontierEntry(Base):
+    __tablename__ = "crawl_frontier"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String(255), nullable=False)
+    query = Column(String(500), nullable=False)
+    # Last page whose jobs are saved; None until the first page is done
+    last_page = Column(Integer, nullable=True)
+    # Page currently being crawled while in flight, last finished page otherwise
+    url = Column(String(500), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")
+    # Failed attempts since the last saved page
+    attempts = Column(Integer, nullable=False, default=0)
+    # When the crawl cycle this entry belongs to started
+    cycle_started_at = Column(DateTime, nullable=True)
+    updated_at = Column(
+        DateTime, nullable=True, default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint("source", "query", name="uq_frontier_source_query"),
+    )
+
+
+class CrawlWatermark(Base):
+    """Newest job seen by the last finished crawl of a search query."""
+
+    __tablename__ = "crawl_watermarks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String(255), nullable=False)
+    query = Column(String(500), nullable=False)
+    newest_external_id = Column(String(255), nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    updated_at = Column(
+        DateTime, nullable=True, default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint("source", "query", name="uq_watermark_source_query"),
+    )
+
+
+class DataVersion(Base):
+    """Single-row counter bumped whenever the crawler changes job listings."""
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    # Bumped by the API whenever favorites change; keys the favorite counts
+    favorites_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=True, default=func.now(), onupdate=func.now()
+    )
+
+
+class SearchIndexWatermark(Base):
+    """How far job_listings have been copied into a search index."""
+
+    __tablename__ = "search_index_watermarks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    index_name = Column(String(255), nullable=False, unique=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    last_crawled_at = Column(Date(), nullable=True)
+    # data_version seen by the last pass; an unchanged version means nothing to do
+    data_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime, nullable=True, default=func.now(), onupdate=func.now()
+    )
+
+
+class Translation(Base):
+    """Translated text shared by every listing whose description hashes the same."""
+
+    __tablename__ = "translations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False, unique=True)
+    translated_text = Column(Text, nullable=False)
+    model = Column(String(255), nullable=True)
+    created_at = Column(DateTime, nullable=True, default=func.now())
+
+
+# Seed the counter with the schema, so bumping it never has to create it
+event.listen(
+    DataVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO data_version (id, version, favorites_version) VALUES (1, 0, 0)"),
+)
+
+
 # SQLite Database Connection
 engine = create_engine(os.getenv("DB_URL"))
 Base.metadata.create_all(engine)
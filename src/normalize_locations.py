@@ -0,0 +1,90 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+import argparse
+from typing import Dict, List
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.location import location_normalizer
+from src.logger import logger
+from src.models import JobListing, session
+from src.persistence import bump_data_version
+
+
+def plan_location_updates(db: Session, batch_size: int = 5000) -> Dict[str, List[str]]:
+    """Map each canonical location to the stored raw values that should become it.
+
+    Only distinct values are read, so the cost grows with the number of
+    distinct locations rather than with the number of jobs.
+    """
+    stmt = (
+        select(JobListing.location)
+        .where(JobListing.location.is_not(None))
+        .distinct()
+        .execution_options(yield_per=batch_size)
+    )
+    updates: Dict[str, List[str]] = {}
+    distinct = 0
+    for location in db.execute(stmt).scalars():
+        distinct += 1
+        normalized = location_normalizer.normalize(location)
+        if normalized != location:
+            updates.setdefault(normalized, []).append(location)
+    logger.info(f"{distinct} distinct locations stored")
+    return updates
+
+
+def apply_location_updates(
+    db: Session, updates: Dict[str, List[str]], chunk_size: int = 500
+) -> int:
+    updated = 0
+    for normalized, raw_locations in updates.items():
+        for start in range(0, len(raw_locations), chunk_size):
+            chunk = raw_locations[start : start + chunk_size]
+            stmt = (
+                update(JobListing)
+                .where(JobListing.location.in_(chunk))
+                .values(location=normalized)
+                .execution_options(synchronize_session=False)
+            )
+            try:
+                chunk_updated = db.execute(stmt).rowcount
+                if chunk_updated:
+                    bump_data_version(db)
+                db.commit()
+                updated += chunk_updated
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error normalizing locations to {normalized}: {e}")
+    return updated
+
+
+def normalize_locations(dry_run: bool = False, batch_size: int = 5000):
+    try:
+        updates = plan_location_updates(session, batch_size)
+        for normalized, raw_locations in sorted(updates.items()):
+            logger.info(f"{normalized} <- {raw_locations}")
+        raw_count = sum(len(raw_locations) for raw_locations in updates.values())
+        if dry_run:
+            logger.info(f"Dry run: {raw_count} distinct locations would be rewritten")
+            return
+
+        updated = apply_location_updates(session, updates)
+        logger.info(f"Rewrote {raw_count} distinct locations in {updated} jobs")
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-normalize the locations of stored jobs"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report what would change"
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    normalize_locations(dry_run=args.dry_run, batch_size=args.batch_size)
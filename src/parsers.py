@@ -0,0 +1,421 @@
+import re
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree, html
+
+from src.job import Job
+from src.logger import logger
+
+# Guest job posting markup first, then the logged-in job view markup
+LINKEDIN_DESCRIPTION_CLASSES = (
+    "show-more-less-html__markup",
+    "jobs-description-content__text--stretch",
+    "job-details-about-the-job-module__description",
+)
+BLOCK_TAGS = {"p", "div", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+def _clean_inner_text(text: str) -> str:
+    text = re.sub(r"[ \t\xa0]+\n", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+class Bs4Parser:
+    """Reference parsers built on BeautifulSoup."""
+
+    name = "bs4"
+
+    def itviec_job_list(self, page_html: str) -> Tuple[List[Job], bool]:
+        page_soup = BeautifulSoup(page_html, "lxml")
+
+        # Find paginate search jobs
+        is_last_page = True
+        paginate_search_jobs = page_soup.find(
+            "div", class_=lambda x: x and "pagination-search-jobs" in x
+        )
+        if paginate_search_jobs:
+            page_next = paginate_search_jobs.find("div", class_="page next")
+            if page_next:
+                is_last_page = False
+
+        jobs = page_soup.find_all("div", class_=lambda x: x and "job-card" in x)
+        job_list: List[Job] = []
+        for job_element in jobs:
+            job = Job()
+            job.title = job_element.find("h3", class_="imt-3").text.strip()
+            job.link = job_element.find("h3", class_="imt-3").get("data-url")
+            job.company = job_element.find(
+                "a", class_="text-rich-grey", target="_blank"
+            ).text.strip()
+            job.job_key = job_element.get("data-job-key")
+            job.location = job_element.find(
+                "div",
+                class_="text-rich-grey text-truncate text-nowrap stretched-link position-relative",
+            ).text.strip()
+            job_list.append(job)
+
+        return job_list, is_last_page
+
+    def itviec_job_description(self, page_html: str) -> Optional[str]:
+        job_soup = BeautifulSoup(page_html, "lxml")
+        job_content_section = job_soup.find(
+            "section", class_=lambda x: x and "job-content" in x
+        )
+        if job_content_section is None:
+            return None
+        return job_content_section.text.strip()
+
+    def linkedin_job_description(self, page_html: str) -> Optional[str]:
+        job_soup = BeautifulSoup(page_html, "lxml")
+        description = job_soup.find(
+            "div",
+            class_=lambda x: x
+            and any(name in x.split() for name in LINKEDIN_DESCRIPTION_CLASSES),
+        )
+        if description is None:
+            return None
+        # Approximate the browser's innerText: line breaks after block elements
+        for tag in description.find_all(["br", *BLOCK_TAGS]):
+            tag.insert_after("\n")
+        return _clean_inner_text(description.get_text()) or None
+
+    def topcv_job_list(self, page_html: str) -> Tuple[List[Job], int]:
+        page_soup = BeautifulSoup(page_html, "lxml")
+        html_lists = page_soup.find("div", class_="job-list-search-result")
+        jobs = html_lists.find_all("div", class_="job-item-search-result")
+        paginate_text = page_soup.find("span", id="job-listing-paginate-text")
+        if paginate_text:
+            last_page = int(paginate_text.text.strip().split("/")[1].split()[0])
+        else:
+            last_page = 1
+        job_list: List[Job] = []
+        for job_element in jobs:
+            job = Job()
+            job.link = job_element.find("h3", class_="title").find("a").get("href")
+            try:
+                job.title = job_element.select_one(
+                    "h3.title a span[data-toggle='tooltip']"
+                ).get_text(strip=True)
+            except Exception:
+                pass
+            try:
+                job.company = job_element.select_one(
+                    "a.company span.company-name"
+                ).get_text(strip=True)
+            except Exception:
+                pass
+            try:
+                job.location = job_element.select_one(
+                    "label.address span.city-text"
+                ).text
+            except Exception:
+                pass
+            job_list.append(job)
+        return job_list, last_page
+
+    def topcv_job_detail(self, job: Job, page_html: str):
+        job_soup = BeautifulSoup(page_html, "lxml")
+        self._handle_regular_job(job, job_soup)
+
+    def _handle_regular_job(self, job: Job, job_soup: BeautifulSoup):
+        job_data = job_soup.find("div", class_="job-detail__body")
+        try:
+            job.title = (
+                job_data.find("h1", class_="job-detail__info--title").get_text().strip()
+            )
+        except AttributeError:
+            logger.warning("Job title is missing")
+
+        try:
+            job.company = (
+                job_data.find("div", class_="job-detail__company--information")
+                .find("div", class_="company-name-label")
+                .find("a")
+                .get_text()
+                .strip()
+            )
+        except AttributeError:
+            logger.warning("Job company is missing")
+
+        try:
+            info_sections = job_data.find_all(
+                "div", class_="job-detail__info--section-content"
+            )
+            for section in info_sections:
+                title = (
+                    section.find(
+                        "div", class_="job-detail__info--section-content-title"
+                    )
+                    .get_text()
+                    .strip()
+                )
+                value = (
+                    section.find(
+                        "div", class_="job-detail__info--section-content-value"
+                    )
+                    .get_text()
+                    .strip()
+                )
+                if title and value and "địa điểm" in title.lower():
+                    job.location = value
+                    break
+        except AttributeError:
+            logger.warning("Job location is missing")
+
+        try:
+            job_description_content = job_data.find("div", "job-description").find_all(
+                "div", class_="job-description__item"
+            )
+            job.description = _join_description_items(
+                item.text for item in job_description_content
+            )
+        except AttributeError:
+            logger.warning("Job description is missing")
+
+
+def _join_description_items(item_texts) -> str:
+    job_description_content_text = []
+    for item_text in item_texts:
+        paragraphs = item_text.split("\n\n")
+        formated_paragraphs = [
+            para.strip().replace("\u00a0", "").replace("\u200b", "")
+            for para in paragraphs
+        ]
+        job_description_content_text.append("\n\n".join(formated_paragraphs))
+    return "\n".join(job_description_content_text)
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _xpath(path: str) -> etree.XPath:
+    return etree.XPath(path)
+
+
+def _tree(page_html: str):
+    try:
+        return html.document_fromstring(page_html)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return html.document_fromstring(page_html.encode("utf-8"))
+
+
+def _first(nodes):
+    if not nodes:
+        raise AttributeError("element not found")
+    return nodes[0]
+
+
+TEXT_NODES = _xpath(".//text()")
+ASCII_SPACES = " \n\t\f\r"
+
+
+def _text(node) -> str:
+    # Same as BeautifulSoup's .text, which collapses whitespace-only strings
+    return "".join(
+        ("\n" if "\n" in text else " ") if not text.strip(ASCII_SPACES) else text
+        for text in TEXT_NODES(node)
+    )
+
+
+def _stripped_text(node) -> str:
+    # Same as BeautifulSoup's get_text(strip=True)
+    return "".join(text.strip() for text in TEXT_NODES(node))
+
+
+class LxmlParser:
+    """Fast parsers using precompiled XPath expressions on lxml trees.
+
+    Produces the same Job fields as Bs4Parser.
+    """
+
+    name = "lxml"
+
+    ITVIEC_NEXT_PAGE = _xpath(
+        "//div[contains(@class, 'pagination-search-jobs')]"
+        "//div[normalize-space(@class)='page next']"
+    )
+    ITVIEC_CARDS = _xpath("//div[contains(@class, 'job-card')]")
+    ITVIEC_TITLE = _xpath(f".//h3[{_has_class('imt-3')}]")
+    ITVIEC_COMPANY = _xpath(
+        f".//a[{_has_class('text-rich-grey')} and @target='_blank']"
+    )
+    ITVIEC_LOCATION = _xpath(
+        ".//div[normalize-space(@class)='text-rich-grey text-truncate text-nowrap "
+        "stretched-link position-relative']"
+    )
+    ITVIEC_CONTENT = _xpath("//section[contains(@class, 'job-content')]")
+
+    TOPCV_LIST = _xpath(f"//div[{_has_class('job-list-search-result')}]")
+    TOPCV_ITEMS = _xpath(f".//div[{_has_class('job-item-search-result')}]")
+    TOPCV_PAGINATE = _xpath("//span[@id='job-listing-paginate-text']")
+    TOPCV_LINK = _xpath(f".//h3[{_has_class('title')}]//a/@href")
+    TOPCV_TITLE = _xpath(
+        f".//h3[{_has_class('title')}]//a//span[@data-toggle='tooltip']"
+    )
+    TOPCV_COMPANY = _xpath(
+        f".//a[{_has_class('company')}]//span[{_has_class('company-name')}]"
+    )
+    TOPCV_LOCATION = _xpath(
+        f".//label[{_has_class('address')}]//span[{_has_class('city-text')}]"
+    )
+
+    TOPCV_BODY = _xpath(f"//div[{_has_class('job-detail__body')}]")
+    TOPCV_DETAIL_TITLE = _xpath(f".//h1[{_has_class('job-detail__info--title')}]")
+    TOPCV_DETAIL_COMPANY = _xpath(
+        f".//div[{_has_class('job-detail__company--information')}]"
+        f"//div[{_has_class('company-name-label')}]//a"
+    )
+    TOPCV_SECTIONS = _xpath(
+        f".//div[{_has_class('job-detail__info--section-content')}]"
+    )
+    TOPCV_SECTION_TITLE = _xpath(
+        f".//div[{_has_class('job-detail__info--section-content-title')}]"
+    )
+    TOPCV_SECTION_VALUE = _xpath(
+        f".//div[{_has_class('job-detail__info--section-content-value')}]"
+    )
+    TOPCV_DESCRIPTION = _xpath(f".//div[{_has_class('job-description')}]")
+    TOPCV_DESCRIPTION_ITEMS = _xpath(f".//div[{_has_class('job-description__item')}]")
+
+    LINKEDIN_DESCRIPTION = _xpath(
+        " | ".join(
+            f"//div[{_has_class(name)}]" for name in LINKEDIN_DESCRIPTION_CLASSES
+        )
+    )
+
+    def itviec_job_list(self, page_html: str) -> Tuple[List[Job], bool]:
+        tree = _tree(page_html)
+        is_last_page = not self.ITVIEC_NEXT_PAGE(tree)
+        job_list: List[Job] = []
+        for job_element in self.ITVIEC_CARDS(tree):
+            job = Job()
+            title_element = _first(self.ITVIEC_TITLE(job_element))
+            job.title = _text(title_element).strip()
+            job.link = title_element.get("data-url")
+            job.company = _text(_first(self.ITVIEC_COMPANY(job_element))).strip()
+            job.job_key = job_element.get("data-job-key")
+            job.location = _text(_first(self.ITVIEC_LOCATION(job_element))).strip()
+            job_list.append(job)
+        return job_list, is_last_page
+
+    def itviec_job_description(self, page_html: str) -> Optional[str]:
+        sections = self.ITVIEC_CONTENT(_tree(page_html))
+        if not sections:
+            return None
+        return _text(sections[0]).strip()
+
+    def linkedin_job_description(self, page_html: str) -> Optional[str]:
+        nodes = self.LINKEDIN_DESCRIPTION(_tree(page_html))
+        if not nodes:
+            return None
+        # Approximate the browser's innerText: line breaks after block elements
+        for node in nodes[0].iter():
+            if node.tag == "br" or node.tag in BLOCK_TAGS:
+                node.tail = "\n" + (node.tail or "")
+        return _clean_inner_text(nodes[0].text_content()) or None
+
+    def topcv_job_list(self, page_html: str) -> Tuple[List[Job], int]:
+        tree = _tree(page_html)
+        html_lists = _first(self.TOPCV_LIST(tree))
+        paginate_text = self.TOPCV_PAGINATE(tree)
+        if paginate_text:
+            text = _text(paginate_text[0])
+            last_page = int(text.strip().split("/")[1].split()[0])
+        else:
+            last_page = 1
+        job_list: List[Job] = []
+        for job_element in self.TOPCV_ITEMS(html_lists):
+            job = Job()
+            job.link = _first(self.TOPCV_LINK(job_element))
+            titles = self.TOPCV_TITLE(job_element)
+            if titles:
+                job.title = _stripped_text(titles[0])
+            companies = self.TOPCV_COMPANY(job_element)
+            if companies:
+                job.company = _stripped_text(companies[0])
+            locations = self.TOPCV_LOCATION(job_element)
+            if locations:
+                job.location = _text(locations[0])
+            job_list.append(job)
+        return job_list, last_page
+
+    def topcv_job_detail(self, job: Job, page_html: str):
+        bodies = self.TOPCV_BODY(_tree(page_html))
+        job_data = bodies[0] if bodies else None
+        if job_data is None:
+            logger.warning("Job details are missing")
+            return
+
+        titles = self.TOPCV_DETAIL_TITLE(job_data)
+        if titles:
+            job.title = _text(titles[0]).strip()
+        else:
+            logger.warning("Job title is missing")
+
+        companies = self.TOPCV_DETAIL_COMPANY(job_data)
+        if companies:
+            job.company = _text(companies[0]).strip()
+        else:
+            logger.warning("Job company is missing")
+
+        for section in self.TOPCV_SECTIONS(job_data):
+            section_titles = self.TOPCV_SECTION_TITLE(section)
+            section_values = self.TOPCV_SECTION_VALUE(section)
+            if not section_titles or not section_values:
+                logger.warning("Job location is missing")
+                break
+            title = _text(section_titles[0]).strip()
+            value = _text(section_values[0]).strip()
+            if title and value and "địa điểm" in title.lower():
+                job.location = value
+                break
+
+        descriptions = self.TOPCV_DESCRIPTION(job_data)
+        if descriptions:
+            job.description = _join_description_items(
+                _text(item) for item in self.TOPCV_DESCRIPTION_ITEMS(descriptions[0])
+            )
+        else:
+            logger.warning("Job description is missing")
+
+
+class FallbackParser:
+    """Runs the fast parser and falls back to BeautifulSoup when it fails."""
+
+    def __init__(self, fast, fallback):
+        self.fast = fast
+        self.fallback = fallback
+        self.name = f"{fast.name}+{fallback.name}"
+
+    def _call(self, method: str, *args):
+        try:
+            return getattr(self.fast, method)(*args)
+        except Exception as e:
+            logger.warning(f"{self.fast.name} parser failed on {method}: {e}")
+            return getattr(self.fallback, method)(*args)
+
+    def itviec_job_list(self, page_html: str) -> Tuple[List[Job], bool]:
+        return self._call("itviec_job_list", page_html)
+
+    def itviec_job_description(self, page_html: str) -> Optional[str]:
+        return self._call("itviec_job_description", page_html)
+
+    def linkedin_job_description(self, page_html: str) -> Optional[str]:
+        return self._call("linkedin_job_description", page_html)
+
+    def topcv_job_list(self, page_html: str) -> Tuple[List[Job], int]:
+        return self._call("topcv_job_list", page_html)
+
+    def topcv_job_detail(self, job: Job, page_html: str):
+        return self._call("topcv_job_detail", job, page_html)
+
+
+def get_parser(name: str = "lxml"):
+    if name == "bs4":
+        return Bs4Parser()
+    if name == "lxml":
+        return FallbackParser(LxmlParser(), Bs4Parser())
+    raise ValueError(f"Unknown parser backend: {name}")
@@ -0,0 +1,129 @@
+from datetime import date
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.job import Job
+from src.logger import logger
+from src.models import DataVersion, JobListing
+from src.utils import standardize_location
+
+
+def job_to_row(job: Job, source_id: int, external_id: str) -> Dict:
+    return {
+        "source_id": source_id,
+        "external_id": external_id,
+        "title": job.title,
+        "company": job.company,
+        "location": standardize_location(job.location),
+        "description": job.description,
+        "url": job.link,
+        "crawled_at": date.today(),
+        "is_expired": False,
+    }
+
+
+def bump_data_version(db: Session):
+    """Mark job listings as changed, in the caller's transaction.
+
+    The API keys its response cache on this version, so cached pages are
+    dropped once the change is committed. An upsert, so concurrent crawlers
+    on a fresh database can't fail on creating the row and lose the jobs
+    committed along with it.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert_ = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = (
+            insert_(DataVersion)
+            .values(id=1, version=1)
+            .on_conflict_do_update(
+                index_elements=[DataVersion.id],
+                set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+            )
+        )
+        db.execute(stmt)
+        return
+
+    stmt = (
+        update(DataVersion)
+        .where(DataVersion.id == 1)
+        .values(version=DataVersion.version + 1)
+    )
+    if db.execute(stmt).rowcount:
+        return
+    # Inserting in a savepoint keeps a lost race from aborting the caller
+    try:
+        with db.begin_nested():
+            db.execute(insert(DataVersion).values(id=1, version=1))
+    except IntegrityError:
+        db.execute(stmt)
+
+
+def get_data_version(db: Session) -> int:
+    version = db.execute(
+        select(DataVersion.version).where(DataVersion.id == 1)
+    ).scalar_one_or_none()
+    return version or 0
+
+
+def _insert_ignore_conflicts(db: Session, dialect: str, rows: List[Dict]) -> int:
+    # No conflict target: a clash on either (source_id, external_id) or url skips the row
+    if dialect == "postgresql":
+        stmt = postgresql.insert(JobListing).values(rows).on_conflict_do_nothing()
+        return db.execute(stmt).rowcount
+    if dialect == "sqlite":
+        stmt = sqlite.insert(JobListing).values(rows).on_conflict_do_nothing()
+        return db.execute(stmt).rowcount
+
+    # Generic fallback: one lookup per chunk instead of one per job
+    existing = set(
+        db.execute(
+            select(JobListing.source_id, JobListing.external_id).where(
+                JobListing.external_id.in_([row["external_id"] for row in rows])
+            )
+        ).all()
+    )
+    new_rows, seen = [], set()
+    for row in rows:
+        key = (row["source_id"], row["external_id"])
+        if key not in existing and key not in seen:
+            seen.add(key)
+            new_rows.append(row)
+    if new_rows:
+        db.execute(insert(JobListing), new_rows)
+    return len(new_rows)
+
+
+def bulk_insert_jobs(
+    db: Session, rows: List[Dict], chunk_size: int = 500
+) -> Tuple[int, int]:
+    """Insert job rows in chunks, skipping ones already stored.
+
+    Returns the number of inserted and skipped rows.
+    """
+    rows = [row for row in rows if row.get("external_id") and row.get("url")]
+    if not rows:
+        return 0, 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Stay below SQLite's bound-parameter limit on older builds
+        chunk_size = min(chunk_size, 900 // len(rows[0]))
+
+    inserted = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        try:
+            chunk_inserted = _insert_ignore_conflicts(db, dialect, chunk)
+            if chunk_inserted:
+                bump_data_version(db)
+            db.commit()
+            inserted += chunk_inserted
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error saving {len(chunk)} jobs: {e}")
+    return inserted, len(rows) - inserted
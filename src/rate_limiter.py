@@ -0,0 +1,140 @@
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from src.logger import logger
+
+# Requests per second for each crawled domain. Buckets start at `rate`, are
+# halved down to `min_rate` on every 429 and creep back up to `max_rate`.
+DOMAIN_LIMITS = {
+    "itviec.com": {"rate": 0.5, "min_rate": 0.05, "max_rate": 2.0},
+    "topcv.vn": {"rate": 0.5, "min_rate": 0.05, "max_rate": 2.0},
+    "linkedin.com": {"rate": 0.3, "min_rate": 0.05, "max_rate": 1.0},
+}
+DEFAULT_LIMIT = {"rate": 0.5, "min_rate": 0.05, "max_rate": 1.0}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds encoded by a Retry-After header, if any."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = 2.0, cap: float = 120.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def domain_key(url: str) -> str:
+    host = urlparse(url).netloc or url
+    host = host.split(":")[0].lower()
+    for domain in DOMAIN_LIMITS:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return host
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to throttling (AIMD)."""
+
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        capacity: float = 1.0,
+        increase: float = 0.02,
+        decrease: float = 0.5,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.capacity = capacity
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate)
+            wait = max(wait, self.blocked_until - now)
+        # A little jitter keeps concurrent callers from firing in lockstep
+        return wait + random.uniform(0, 0.25 / self.rate)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, delay: float):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + delay)
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, Dict] = DOMAIN_LIMITS):
+        self.limits = limits
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        key = domain_key(url)
+        with self._lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(**self.limits.get(key, DEFAULT_LIMIT))
+            return self.buckets[key]
+
+    async def acquire(self, url: str):
+        await asyncio.sleep(self.bucket(url).reserve())
+
+    def wait(self, url: str):
+        time.sleep(self.bucket(url).reserve())
+
+    def on_success(self, url: str):
+        self.bucket(url).on_success()
+
+    def on_throttle(
+        self, url: str, attempt: int, retry_after: Optional[str] = None
+    ) -> float:
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        bucket = self.bucket(url)
+        bucket.on_throttle(delay)
+        logger.info(
+            f"Throttled by {domain_key(url)}, backing off {delay:.1f}s "
+            f"(rate now {bucket.rate:.2f} req/s)"
+        )
+        return delay
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,343 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from elasticsearch import Elasticsearch
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from src.es_indexer import INDEX_ALIAS
+from src.location import fold
+from src.logger import logger
+from src.models import JobListing, JobSource
+from src.models import Session as SessionFactory
+from src.persistence import get_data_version
+
+TOKEN_REGEX = re.compile(r"\w+")
+
+# Field weights, so a match in the title counts more than one in the description
+FIELD_WEIGHTS = {"title": 3.0, "company": 2.0, "location": 1.0, "description": 1.0}
+
+
+def search_tokens(text: Optional[str]) -> List[str]:
+    """Accent-insensitive word tokens, so "ky su" finds "Kỹ sư"."""
+    return TOKEN_REGEX.findall(fold(text)) if text else []
+
+
+@dataclass
+class SearchHits:
+    total: int
+    ids: List[int]
+    # Whole jobs when the backend stores them, otherwise load them by id
+    documents: Optional[List[Dict]] = None
+    next_after_id: Optional[int] = None
+
+
+class InvertedIndex:
+    """Compact in-memory BM25 index over the job text fields.
+
+    Each field's term frequencies are scaled by its weight and summed, which is
+    a simple form of BM25F. Source and location are kept per document for
+    filtering.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.doc_lengths: Dict[int, float] = {}
+        self.doc_filters: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+        self.doc_terms: Dict[int, List[str]] = {}
+        self.total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(
+        self,
+        doc_id: int,
+        fields: Dict[str, Optional[str]],
+        source: Optional[str] = None,
+        location: Optional[str] = None,
+    ):
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        frequencies: Counter = Counter()
+        for name, weight in FIELD_WEIGHTS.items():
+            for token in search_tokens(fields.get(name)):
+                frequencies[token] += weight
+        for token, frequency in frequencies.items():
+            self.postings.setdefault(token, {})[doc_id] = frequency
+        length = sum(frequencies.values())
+        self.doc_lengths[doc_id] = length
+        self.doc_filters[doc_id] = (source, location)
+        self.doc_terms[doc_id] = list(frequencies)
+        self.total_length += length
+
+    def remove(self, doc_id: int):
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.doc_filters.pop(doc_id)
+        self.total_length -= length
+        for token in self.doc_terms.pop(doc_id):
+            del self.postings[token][doc_id]
+            if not self.postings[token]:
+                del self.postings[token]
+
+    def search(
+        self,
+        query: str,
+        source: Optional[str] = None,
+        locations: Optional[Iterable[str]] = None,
+        offset: int = 0,
+        limit: int = 10,
+        after_id: Optional[int] = None,
+    ) -> Tuple[int, List[int]]:
+        """Return the number of matches and one page of ids, best first.
+
+        With after_id the page starts right after that id in the ranking; the
+        offset is only used when it's no longer there.
+        """
+        if not self.doc_lengths:
+            return 0, []
+        locations = set(locations or [])
+        doc_count = len(self.doc_lengths)
+        average_length = self.total_length / doc_count or 1.0
+        scores: Dict[int, float] = {}
+        for token in set(search_tokens(query)):
+            docs = self.postings.get(token)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, frequency in docs.items():
+                doc_source, doc_location = self.doc_filters[doc_id]
+                if source and doc_source != source:
+                    continue
+                if locations and doc_location not in locations:
+                    continue
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[doc_id] / average_length
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (
+                    self.k1 + 1
+                ) / (frequency + norm)
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], -doc_id))
+        if after_id in scores:
+            offset = ranked.index(after_id) + 1
+        return len(ranked), ranked[offset : offset + limit]
+
+
+class ElasticsearchBackend:
+    def __init__(self, url: Optional[str] = None, index: str = INDEX_ALIAS):
+        self.es = Elasticsearch(url or os.getenv("ELASTICSEARCH_URL"))
+        self.index = index
+
+    def search(
+        self,
+        query: str,
+        source: Optional[str],
+        locations: Optional[List[str]],
+        page: int,
+        per_page: int,
+        after_id: Optional[int] = None,
+    ) -> SearchHits:
+        es_query = {
+            "query": {
+                "bool": {
+                    "must": {
+                        "multi_match": {
+                            "query": query,
+                            "fields": ["title", "company", "location", "description"],
+                            "type": "best_fields",
+                        }
+                    },
+                    "filter": [],
+                }
+            },
+            "sort": [{"id": {"order": "desc"}}],
+            "size": per_page,
+        }
+        if after_id is None:
+            es_query["from"] = (page - 1) * per_page
+        else:
+            es_query["search_after"] = [after_id]
+        if source:
+            es_query["query"]["bool"]["filter"].append({"term": {"source": source}})
+        if locations and len(locations) > 0:
+            es_query["query"]["bool"]["filter"].append(
+                {"terms": {"location": locations}}
+            )
+        es_response = self.es.search(index=self.index, body=es_query)
+        hits = es_response["hits"]["hits"]
+        total = (
+            es_response["hits"]["total"]["value"]
+            if isinstance(es_response["hits"]["total"], dict)
+            else es_response["hits"]["total"]
+        )
+        documents = [hit["_source"] for hit in hits]
+        ids = [document["id"] for document in documents]
+        return SearchHits(
+            total=total,
+            ids=ids,
+            documents=documents,
+            next_after_id=ids[-1] if len(ids) == per_page else None,
+        )
+
+
+class LocalSearchBackend:
+    """In-process BM25 search over job_listings, no external service needed.
+
+    The index is built from the database on first use. When the data version
+    moves, rows past the last id or crawled since the last crawl date are
+    (re)indexed and deleted jobs are dropped. Edits to older rows, like
+    location backfills, are picked up by a full rebuild every
+    ``rebuild_interval`` seconds, built aside and swapped in.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        refresh_interval: float = 5,
+        rebuild_interval: float = 600,
+    ):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.index = InvertedIndex()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._last_check = 0.0
+        self._built_at = 0.0
+        self._data_version: Optional[int] = None
+        self._last_id = 0
+        self._last_crawled_at = None
+
+    def _due(self) -> bool:
+        return (
+            self._data_version is None
+            or time.monotonic() - self._last_check >= self.refresh_interval
+        )
+
+    def refresh(self):
+        if not self._due():
+            return
+        # One refresh at a time; searches keep using the current index meanwhile,
+        # except for the very first build which they have to wait for
+        if not self._refresh_lock.acquire(blocking=self._data_version is None):
+            return
+        db: Session = self.session_factory()
+        try:
+            if not self._due():
+                return
+            self._last_check = time.monotonic()
+            data_version = get_data_version(db)
+            if data_version == self._data_version:
+                return
+            if time.monotonic() - self._built_at >= self.rebuild_interval:
+                self._rebuild(db)
+            else:
+                with self._lock:
+                    self._load(db, self.index, incremental=True)
+                    self._remove_deleted(db)
+            self._data_version = data_version
+        except Exception as e:
+            logger.error(f"Error refreshing the search index: {e}")
+        finally:
+            db.close()
+            self._refresh_lock.release()
+
+    def _rebuild(self, db: Session):
+        index = InvertedIndex()
+        self._last_id, self._last_crawled_at = 0, None
+        self._load(db, index, incremental=False)
+        with self._lock:
+            self.index = index
+        self._built_at = time.monotonic()
+
+    def _remove_deleted(self, db: Session):
+        # The index holds every stored job, so equal counts mean nothing was deleted
+        count = db.execute(select(func.count()).select_from(JobListing)).scalar_one()
+        if count == len(self.index):
+            return
+        job_ids = set(db.execute(select(JobListing.id)).scalars())
+        deleted = [doc_id for doc_id in self.index.doc_lengths if doc_id not in job_ids]
+        for doc_id in deleted:
+            self.index.remove(doc_id)
+        if deleted:
+            logger.info(f"Removed {len(deleted)} deleted jobs from the search index")
+
+    def _load(self, db: Session, index: InvertedIndex, incremental: bool):
+        stmt = (
+            select(
+                JobListing.id,
+                JobListing.title,
+                JobListing.company,
+                JobListing.location,
+                JobListing.description,
+                JobListing.crawled_at,
+                JobSource.name,
+            )
+            .join(JobSource, JobListing.source_id == JobSource.id)
+            .execution_options(yield_per=2000)
+        )
+        if incremental:
+            filters = [JobListing.id > self._last_id]
+            if self._last_crawled_at:
+                filters.append(JobListing.crawled_at >= self._last_crawled_at)
+            stmt = stmt.where(or_(*filters))
+        count = 0
+        for row in db.execute(stmt):
+            index.add(
+                row.id,
+                {
+                    "title": row.title,
+                    "company": row.company,
+                    "location": row.location,
+                    "description": row.description,
+                },
+                source=row.name,
+                location=row.location,
+            )
+            self._last_id = max(self._last_id, row.id)
+            if row.crawled_at and (
+                self._last_crawled_at is None or row.crawled_at > self._last_crawled_at
+            ):
+                self._last_crawled_at = row.crawled_at
+            count += 1
+        if count:
+            logger.info(f"Indexed {count} jobs, {len(index)} searchable")
+
+    def search(
+        self,
+        query: str,
+        source: Optional[str],
+        locations: Optional[List[str]],
+        page: int,
+        per_page: int,
+        after_id: Optional[int] = None,
+    ) -> SearchHits:
+        self.refresh()
+        with self._lock:
+            total, ids = self.index.search(
+                query, source, locations, (page - 1) * per_page, per_page, after_id
+            )
+        return SearchHits(
+            total=total,
+            ids=ids,
+            next_after_id=ids[-1] if len(ids) == per_page else None,
+        )
+
+
+def get_search_backend(name: Optional[str] = None):
+    name = name or os.getenv("SEARCH_BACKEND", "elasticsearch")
+    if name == "local":
+        return LocalSearchBackend(SessionFactory)
+    if name == "elasticsearch":
+        return ElasticsearchBackend()
+    raise ValueError(f"Unknown search backend {name}")
@@ -1,26 +1,31 @@
-import random
 import re
-import time
 import traceback
 import urllib
 import urllib.parse
-from datetime import date
 from typing import Dict, List
 
 import cloudscraper
-from bs4 import BeautifulSoup
 from sqlalchemy import or_
 from tqdm import tqdm
 
+from src.blacklist import JobBlacklist
+from src.fetcher import AsyncFetcher, FetchError
+from src.frontier import CrawlFrontier
+from src.http_cache import HttpCache
 from src.job import Job
+from src.job_index import KnownJobIndex
 from src.logger import logger
 from src.models import JobListing, JobSource, session
-from src.utils import standardize_location
+from src.parsers import get_parser
+from src.persistence import bulk_insert_jobs, bump_data_version, job_to_row
 
 
 class TopCVJobManager:
-    def __init__(self, scraper: cloudscraper.CloudScraper):
+    def __init__(self, scraper: cloudscraper.CloudScraper, db_session=None):
         self.scraper = scraper
+        self.session = db_session or session
+        self.fetcher = AsyncFetcher(scraper, max_concurrency=4, cache=HttpCache())
+        self.parser = get_parser()
 
     def set_parameters(self, parameters: Dict):
         logger.info("Setting parameters")
@@ -28,94 +33,95 @@ class TopCVJobManager:
         self.locations: List = parameters.get("locations", [])
         self.title_blacklist: List = parameters.get("title_blacklist", [])
         self.company_blacklist: List = parameters.get("company_blacklist", [])
+        self.blacklist = JobBlacklist.from_parameters(parameters)
+        self.parser = get_parser(parameters.get("parser", "lxml"))
 
     def retrieve_job_details(self):
         job_records = (
-            session.query(JobListing)
+            self.session.query(JobListing)
             .join(JobSource)
             .filter(JobSource.name == "TopCV")
             .filter(or_(JobListing.description == "", JobListing.description.is_(None)))
             .all()
         )
-        for job_record in tqdm(job_records):
-            job = Job(link=job_record.url)
-            self._get_job_description(job)
-            try:
+        job_records = [record for record in job_records if "/brand/" not in record.url]
+        batch_size = 50
+        for start in tqdm(range(0, len(job_records), batch_size)):
+            batch = job_records[start : start + batch_size]
+            responses = self.fetcher.fetch_all(
+                [record.url for record in batch], use_cache=True
+            )
+            for job_record, job_response in zip(batch, responses):
+                job = Job(link=job_record.url)
+                self._parse_job_description(job, job_response)
                 job_record.company = job.company
                 job_record.description = job.description
                 job_record.title = job.title
                 job_record.location = job.location
-                session.commit()
+            try:
+                bump_data_version(self.session)
+                self.session.commit()
             except Exception as e:
                 logger.error(e)
-                session.rollback()
+                self.session.rollback()
 
     def collecting_data(self):
-        job_list: List[Job] = []
+        job_source = self.session.query(JobSource).filter_by(name="TopCV").first()
+        if not job_source:
+            job_source = JobSource(name="TopCV")
+            try:
+                self.session.add(job_source)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"Error when creating job source TopCV.")
+
+        known_jobs = KnownJobIndex.load(self.session, job_source)
+        get_job_id = lambda job: self.get_job_id(job.link or "")
+        frontier = CrawlFrontier(self.session, "TopCV")
+        frontier.start(self.positions)
+        job_count = 0
+        # Unlike LinkedIn, listings aren't sorted by date, so there's no
+        # incremental early stop: a pinned job that is already stored says
+        # nothing about the pages after it
         for position in self.positions:
+            if frontier.is_finished(position):
+                continue
             try:
-                job_page_number = 0
+                job_page_number = frontier.last_page(position, default=0)
                 last_page = 20
                 while job_page_number <= last_page:
                     job_page_number += 1
                     next_job_page_url = self.next_job_page(position, job_page_number)
+                    frontier.mark_in_flight(position, next_job_page_url)
                     job_sub_list, last_page = self.read_jobs(next_job_page_url)
-                    job_sub_list = [
-                        job
-                        for job in job_sub_list
-                        if not self.is_blacklisted(job.company, job.title)
-                    ]
-                    job_list.extend(job_sub_list)
+                    job_sub_list = self.blacklist.filter(job_sub_list)
+                    new_jobs = known_jobs.new_jobs(job_sub_list, get_job_id)
+                    known_jobs.add(get_job_id(job) for job in new_jobs)
+                    self.save_jobs_to_db(new_jobs, job_source)
+                    frontier.mark_page_done(position, job_page_number)
+                    job_count += len(new_jobs)
+                frontier.mark_done(position)
             except Exception as e:
+                # Left in flight, so the next run resumes at the failed page
                 logger.error(e)
+                frontier.mark_failed(position)
                 traceback.print_exc()
-                pass
 
-        logger.info(f"Number of extracted jobs: {len(job_list)}")
+        logger.info(f"Number of extracted jobs: {job_count}")
+        return job_count
 
-        # Insert into db
-        job_source = session.query(JobSource).filter_by(name="TopCV").first()
-        if not job_source:
-            job_source = JobSource(name="TopCV")
-            try:
-                session.add(job_source)
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error when creating job source TopCV.")
+    def get_job_id(self, job_link: str):
+        return job_link.split("/")[-1].split(".html")[0]
 
-        for job in tqdm(job_list):
-            self.save_job_to_db(job, job_source)
-
-    def save_job_to_db(self, job: Job, job_source: JobSource):
-        try:
-            topcv_job_id = job.link.split("/")[-1].split(".html")[0]
-            existing_job = (
-                session.query(JobListing).filter_by(external_id=topcv_job_id).first()
-            )
-            if existing_job:
-                return
-
-            job_listing = JobListing(
-                source_id=job_source.id,
-                external_id=topcv_job_id,
-                title=job.title,
-                company=job.company,
-                location=standardize_location(job.location),
-                description=job.description,
-                url=job.link,
-                crawled_at=date.today(),
-                is_expired=False,
-            )
-            session.add(job_listing)
-            try:
-                session.commit()
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Error saving job: {e}")
-        except Exception as e:
-            logger.error(e)
-            return
+    def save_jobs_to_db(self, job_list: List[Job], job_source: JobSource):
+        rows = [
+            job_to_row(job, job_source.id, self.get_job_id(job.link))
+            for job in job_list
+            if job.link
+        ]
+        inserted, skipped = bulk_insert_jobs(self.session, rows)
+        logger.info(f"Saved {inserted} new jobs, skipped {skipped} existing jobs.")
 
     def next_job_page(self, position, job_page):
         encoded_position = urllib.parse.quote(re.sub(r"\s+", "-", position.strip()))
@@ -123,145 +129,25 @@ class TopCVJobManager:
 
     def read_jobs(self, page_url):
         logger.info(page_url)
-        time.sleep(random.uniform(7, 10))
-        page_response = self.scraper.get(page_url)
-        retry_cnt = 5
-        while page_response.status_code == 429 and retry_cnt:
-            logger.info(f"Retrying...")
-            time.sleep(random.uniform(7, 10))
-            page_response = self.scraper.get(page_url)
-            retry_cnt -= 1
-        if page_response.status_code != 200:
-            logger.error(f"Error: {page_response.status_code}")
-            return
-        page_soup = BeautifulSoup(page_response.text, "lxml")
-        html_lists = page_soup.find("div", class_="job-list-search-result")
-        jobs = html_lists.find_all("div", class_="job-item-search-result")
-        paginate_text = page_soup.find("span", id="job-listing-paginate-text")
-        if paginate_text:
-            last_page = int(paginate_text.text.strip().split("/")[1].split()[0])
-        else:
-            last_page = 1
-        job_list: List[Job] = []
-        for job_element in jobs:
-            job = Job()
-            job.link = job_element.find("h3", class_="title").find("a").get("href")
-            try:
-                job.title = job_element.select_one(
-                    "h3.title a span[data-toggle='tooltip']"
-                ).get_text(strip=True)
-            except Exception:
-                pass
-            try:
-                job.company = job_element.select_one(
-                    "a.company span.company-name"
-                ).get_text(strip=True)
-            except Exception:
-                pass
-            try:
-                job.location = job_element.select_one(
-                    "label.address span.city-text"
-                ).text
-            except Exception:
-                pass
-            job_list.append(job)
-        return job_list, last_page
-
-    def _handle_regular_job(self, job: Job, job_soup: BeautifulSoup):
-        job_data = job_soup.find("div", class_="job-detail__body")
-        try:
-            job.title = (
-                job_data.find("h1", class_="job-detail__info--title").get_text().strip()
-            )
-        except AttributeError:
-            logger.warning("Job title is missing")
-
-        try:
-            job.company = (
-                job_data.find("div", class_="job-detail__company--information")
-                .find("div", class_="company-name-label")
-                .find("a")
-                .get_text()
-                .strip()
-            )
-        except AttributeError:
-            logger.warning("Job company is missing")
-
-        try:
-            info_sections = job_data.find_all(
-                "div", class_="job-detail__info--section-content"
+        page_response = self.fetcher.fetch(page_url)
+        if page_response is None or page_response.status_code != 200:
+            raise FetchError(
+                f"Error fetching {page_url}: "
+                f"HTTP {getattr(page_response, 'status_code', None)}"
             )
-            for section in info_sections:
-                title = (
-                    section.find(
-                        "div", class_="job-detail__info--section-content-title"
-                    )
-                    .get_text()
-                    .strip()
-                )
-                value = (
-                    section.find(
-                        "div", class_="job-detail__info--section-content-value"
-                    )
-                    .get_text()
-                    .strip()
-                )
-                if title and value and "địa điểm" in title.lower():
-                    job.location = value
-                    break
-        except AttributeError:
-            logger.warning("Job location is missing")
+        return self.parse_job_list(page_response.text)
 
-        try:
-            # Parse job description
-            job_description_section = job_data.find("div", "job-description").find_all(
-                "h3"
-            )
-            job_description_section_text = [
-                item.text.strip() for item in job_description_section
-            ]
-            job_description_content = job_data.find("div", "job-description").find_all(
-                "div", class_="job-description__item"
-            )
-            job_description_content_text = []
-            for item in job_description_content:
-                paragraphs = item.text.split("\n\n")
-                formated_paragraphs = [
-                    para.strip().replace("\u00a0", "").replace("\u200b", "")
-                    for para in paragraphs
-                ]
-                job_description_content_text.append("\n\n".join(formated_paragraphs))
-            job.description = "\n".join(job_description_content_text)
-        except AttributeError:
-            logger.warning("Job description is missing")
+    def parse_job_list(self, page_html: str):
+        return self.parser.topcv_job_list(page_html)
 
     def _get_job_description(self, job: Job):
         if "/brand/" in job.link:
             return
-        time.sleep(random.uniform(3, 5))
-        job_response = self.scraper.get(job.link)
-        retry_cnt = 5
-        while job_response.status_code == 429 and retry_cnt:
-            logger.info("Retrying..")
-            time.sleep(random.uniform(7, 10))
-            job_response = self.scraper.get(job.link)
-            retry_cnt -= 1
-        if job_response.status_code != 200:
-            logger.error(f"Error: {job_response.status_code}")
-            return
-        job_soup = BeautifulSoup(job_response.text, "lxml")
-        self._handle_regular_job(job, job_soup)
+        job_response = self.fetcher.fetch(job.link, use_cache=True)
+        self._parse_job_description(job, job_response)
 
-    def is_blacklisted(self, company, job_title):
-        company_blacklisted = any(
-            re.search(rf"\b{re.escape(pattern)}\b", company, re.IGNORECASE)
-            for pattern in self.company_blacklist
-        )
-        title_blacklisted = any(
-            re.search(rf"\b{re.escape(pattern)}\b", job_title, re.IGNORECASE)
-            for pattern in self.title_blacklist
-        )
-        is_blacklisted = company_blacklisted or title_blacklisted
-        if is_blacklisted:
-            logger.info(f"Blacklist: Job {job_title} at {company}.")
-        return is_blacklisted
+    def _parse_job_description(self, job: Job, job_response):
+        if job_response is None or job_response.status_code != 200:
+            logger.error(f"Error: {getattr(job_response, 'status_code', None)}")
+            return
+        self.parser.topcv_job_detail(job, job_response.text)
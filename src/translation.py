@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import os
+import re
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+import google.generativeai as genai
+
+from src.logger import logger
+from src.ttl_cache import TTLCache
+
+PROMPT = "Translate the following English text into Vietnamese while maintaining the intended formatting as closely as possible. Use **abc** for bold text and * abc for bundle formatting, but adapt flexibly if needed to ensure readability and natural presentation.:\n\n{text}"
+
+BATCH_PROMPT = (
+    "Translate each of the following job descriptions from English into "
+    "Vietnamese while maintaining the intended formatting as closely as possible. "
+    "Use **abc** for bold text and * abc for bundle formatting. Each text starts "
+    "with a marker like <<<1>>>. Repeat every marker unchanged on its own line "
+    "followed by the translation of that text, and output nothing else.\n\n"
+)
+BATCH_MARKER = re.compile(r"^<<<(\d+)>>>[ \t]*$", re.MULTILINE)
+
+
+def content_hash(text: str) -> str:
+    # Whitespace-only differences between reposts share one translation
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def build_batch_prompt(texts: List[str]) -> str:
+    sections = [f"<<<{number}>>>\n{text}" for number, text in enumerate(texts, 1)]
+    return BATCH_PROMPT + "\n\n".join(sections)
+
+
+def split_batch_response(response: str, count: int) -> Optional[List[str]]:
+    """Cut a batched answer at its markers; None unless all ``count`` are there."""
+    parts = BATCH_MARKER.split(response)
+    translations = {}
+    for number, text in zip(parts[1::2], parts[2::2]):
+        translations[int(number)] = text.strip()
+    if sorted(translations) != list(range(1, count + 1)):
+        return None
+    return [translations[number] for number in range(1, count + 1)]
+
+
+class LeaderCancelled(Exception):
+    """The in-flight translation a request waited on was cancelled, not failed."""
+
+
+class GeminiModel:
+    def __init__(self, model_name: str = "gemini-2.0-flash"):
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    async def translate(self, text: str) -> str:
+        response = await self.model.generate_content_async(PROMPT.format(text=text))
+        return response.text
+
+    async def translate_stream(self, text: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(
+            PROMPT.format(text=text), stream=True
+        )
+        async for chunk in response:
+            yield chunk.text
+
+    async def translate_batch(self, texts: List[str]) -> List[str]:
+        if len(texts) == 1:
+            return [await self.translate(texts[0])]
+        response = await self.model.generate_content_async(build_batch_prompt(texts))
+        translations = split_batch_response(response.text, len(texts))
+        if translations is None:
+            logger.warning(f"Malformed batch of {len(texts)}, translating one by one")
+            translations = await asyncio.gather(*map(self.translate, texts))
+        return list(translations)
+
+
+class StubModel:
+    """Deterministic offline model for tests and local development."""
+
+    name = "stub"
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+
+    async def translate(self, text: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"[vi] {text}"
+
+    async def translate_stream(self, text: str) -> AsyncIterator[str]:
+        self.calls += 1
+        for chunk in re.findall(r"\S+\s*|\s+", f"[vi] {text}"):
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+    async def translate_batch(self, texts: List[str]) -> List[str]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [f"[vi] {text}" for text in texts]
+
+
+class MemoryTranslationStore:
+    def __init__(self):
+        self.translations: Dict[str, str] = {}
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        return {key: self.translations[key] for key in keys if key in self.translations}
+
+    async def put_many(self, translations: Dict[str, str], model_name: str):
+        self.translations.update(translations)
+
+
+class Translator:
+    """Translates text once per distinct content.
+
+    Results are looked up by content hash in a small in-memory cache, then in
+    the shared store. Concurrent requests for the same text wait on a single
+    in-flight model call, and ``translate_many`` sends the misses in batched
+    prompts.
+    """
+
+    def __init__(self, model, store, batch_size: int = 5, batch_chars: int = 12000):
+        self.model = model
+        self.store = store
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.cache = TTLCache(maxsize=1024, ttl=3600)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def cached(self, key: str) -> Optional[str]:
+        translated = self.cache.get(key)
+        if translated is None:
+            translated = (await self.store.get_many([key])).get(key)
+            if translated is not None:
+                self.cache.set(key, translated)
+        return translated
+
+    async def _lookup(self, key: str) -> Optional[str]:
+        """Cached or in-flight result; None when the caller has to translate."""
+        while True:
+            translated = await self.cached(key)
+            if translated is not None or key not in self._in_flight:
+                return translated
+            try:
+                return await asyncio.shield(self._in_flight[key])
+            except LeaderCancelled:
+                # Its caller went away, so one of the waiters takes over
+                continue
+
+    async def translate(self, text: str) -> str:
+        key = content_hash(text)
+        translated = await self._lookup(key)
+        if translated is not None:
+            return translated
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            translated = await self.model.translate(text)
+            await self._save({key: translated})
+            future.set_result(translated)
+            return translated
+        except BaseException as e:
+            # On cancellation waiters retry instead of sharing the error
+            future.set_exception(e if isinstance(e, Exception) else LeaderCancelled())
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def translate_stream(self, text: str) -> AsyncIterator[str]:
+        """Yield the translation as the model produces it.
+
+        Cached text comes back as a single chunk. While the stream runs, other
+        requests for the same text wait for its result instead of calling the
+        model again.
+        """
+        key = content_hash(text)
+        translated = await self._lookup(key)
+        if translated is not None:
+            yield translated
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        chunks = []
+        try:
+            async for chunk in self.model.translate_stream(text):
+                chunks.append(chunk)
+                yield chunk
+            translated = "".join(chunks)
+            await self._save({key: translated})
+            future.set_result(translated)
+        except BaseException as e:
+            # Also covers a client disconnecting mid-stream
+            future.set_exception(e if isinstance(e, Exception) else LeaderCancelled())
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def translate_many(self, texts: List[str]) -> List[str]:
+        keys = [content_hash(text) for text in texts]
+        found = {key: self.cache.get(key) for key in set(keys)}
+        found = {key: value for key, value in found.items() if value is not None}
+        found.update(await self.store.get_many(set(keys) - set(found)))
+
+        misses: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in misses:
+                misses[key] = text
+        for batch in self._batches(list(misses.items())):
+            translations = await self.model.translate_batch([text for _, text in batch])
+            translated = {key: value for (key, _), value in zip(batch, translations)}
+            await self._save(translated)
+            found.update(translated)
+        return [found[key] for key in keys]
+
+    def _batches(self, items: List) -> Iterable[List]:
+        batch, size = [], 0
+        for item in items:
+            if batch and (
+                len(batch) >= self.batch_size or size + len(item[1]) > self.batch_chars
+            ):
+                yield batch
+                batch, size = [], 0
+            batch.append(item)
+            size += len(item[1])
+        if batch:
+            yield batch
+
+    async def _save(self, translations: Dict[str, str]):
+        for key, translated in translations.items():
+            self.cache.set(key, translated)
+        try:
+            await self.store.put_many(translations, self.model.name)
+        except Exception as e:
+            logger.error(f"Error saving {len(translations)} translations: {e}")
+
+
+def get_translation_model(name: Optional[str] = None):
+    name = name or os.getenv("TRANSLATION_MODEL", "gemini-2.0-flash")
+    if name == "stub":
+        return StubModel()
+    return GeminiModel(name)
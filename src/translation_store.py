@@ -0,0 +1,49 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.async_db import AsyncSessionLocal
+from src.models import Translation
+
+
+class DbTranslationStore:
+    """Translations table keyed by content hash, shared by all listings."""
+
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(Translation.content_hash, Translation.translated_text).where(
+                    Translation.content_hash.in_(keys)
+                )
+            )
+            return dict(rows.all())
+
+    async def put_many(self, translations: Dict[str, str], model_name: str):
+        if not translations:
+            return
+        rows = [
+            {"content_hash": key, "translated_text": text, "model": model_name}
+            for key, text in translations.items()
+        ]
+        async with self.session_factory() as db:
+            dialect = db.get_bind().dialect.name
+            # Another worker may have stored the same content meanwhile
+            if dialect == "postgresql":
+                stmt = postgresql.insert(Translation).on_conflict_do_nothing()
+            elif dialect == "sqlite":
+                stmt = sqlite.insert(Translation).on_conflict_do_nothing()
+            else:
+                existing = await self.get_many(translations)
+                rows = [row for row in rows if row["content_hash"] not in existing]
+                stmt = insert(Translation)
+            if rows:
+                await db.execute(stmt, rows)
+                await db.commit()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+import argparse
+import asyncio
+from typing import List
+
+from sqlalchemy import select, update
+
+from src.async_db import AsyncSessionLocal
+from src.logger import logger
+from src.models import JobListing, JobSource
+from src.translation import Translator, get_translation_model
+from src.translation_store import DbTranslationStore
+
+
+async def pretranslate(
+    translator: Translator, sources: List[str], limit: int = 100
+) -> int:
+    """Translate the newest untranslated descriptions of the given sources."""
+    async with AsyncSessionLocal() as db:
+        rows = (
+            await db.execute(
+                select(JobListing.id, JobListing.description)
+                .join(JobSource, JobListing.source_id == JobSource.id)
+                .where(
+                    JobSource.name.in_(sources),
+                    JobListing.translated_description.is_(None),
+                    JobListing.description.is_not(None),
+                    JobListing.description != "",
+                )
+                .order_by(JobListing.id.desc())
+                .limit(limit)
+            )
+        ).all()
+        if not rows:
+            return 0
+        translations = await translator.translate_many(
+            [description for _, description in rows]
+        )
+        await db.execute(
+            update(JobListing),
+            [
+                {"id": job_id, "translated_description": translated}
+                for (job_id, _), translated in zip(rows, translations)
+            ],
+        )
+        await db.commit()
+    logger.info(f"Translated {len(rows)} job descriptions")
+    return len(rows)
+
+
+async def run(sources: List[str], limit: int, watch: float):
+    translator = Translator(get_translation_model(), DbTranslationStore())
+    while True:
+        try:
+            translated = await pretranslate(translator, sources, limit)
+        except Exception as e:
+            logger.error(f"Error pre-translating descriptions: {e}")
+            translated = 0
+        if not watch:
+            break
+        # Keep draining the backlog, then wait for new listings
+        if translated < limit:
+            await asyncio.sleep(watch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-translate new job descriptions in batches"
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        default=["LinkedIn", "ITViec"],
+        help="Job sources whose descriptions are in English",
+    )
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument(
+        "--watch", type=float, metavar="SECONDS", help="Keep running at this interval"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.sources, args.limit, args.watch))
@@ -1,14 +1,14 @@
 import random
-import re
 import time
 
 from selenium import webdriver
 from selenium.webdriver.remote.webelement import WebElement
 
+from src.location import location_normalizer
 from src.logger import logger
 
 
-def chrome_browser_options():
+def chrome_browser_options(user_data_dir="Default"):
     options = webdriver.ChromeOptions()
 
     options.add_argument("--disable-software-rasterizer")
@@ -21,7 +21,7 @@ def chrome_browser_options():
     options.add_argument("window-size=1200x800")
     options.add_argument("--disable-popup-blocking")
     options.add_argument("--headless=new")
-    options.add_argument("user-data-dir=Default")
+    options.add_argument(f"user-data-dir={user_data_dir}")
     return options
 
 
@@ -96,40 +96,5 @@ def scroll_slow(
         logger.error(e)
 
 
-# Location mapping for standardization
-LOCATION_MAPPING = {
-    "Hà Nội": ["Hanoi", "Ha Noi", "Hà Nội"],
-    "Hồ Chí Minh": ["Ho Chi Minh", "Hồ Chí Minh", "Thu Đuc"],
-    "Đà Nẵng": ["Danang", "Đà Nẵng", "Da Nang"],
-    "Hải Dương": ["Hai Duong", "Hải Dương"],
-    "Hà Nam": ["Ha Nam", "Hà Nam"],
-    "Đồng Tháp": ["Dong Thap", "Đồng Tháp"],
-    "Bến Tre": ["Ben Tre", "Bến Tre"],
-    "Tuyên Quang": ["Tuyen Quang", "Tuyên Quang"],
-    "Nghệ An": ["Nghe An", "Nghệ An"],
-    "Đồng Nai": ["Dong Nai", "Đồng Nai"],
-    "Long An": ["Long An", "Long An"],
-    "Cần Thơ": ["Can Tho", "Cần Thơ"],
-    "Bình Dương": ["Binh Duong", "Bình Dương", "Thu Dau Mot"],
-    "Vũng Tàu": ["Vung Tau", "Vũng Tàu"],
-    "Ninh Thuận": ["Ninh Thuan", "Ninh Thuận"],
-    "Bắc Ninh": ["Bac Ninh", "Bắc Ninh"],
-    "Quãng Ngãi": ["Quang Ngai", "Quãng Ngãi"],
-    "Hải Phòng": ["Hai Phong", "Hải Phòng"],
-    "An Giang": ["An Giang"],
-    "Hưng Yên": ["Hung Yen", "Hưng Yên"],
-    "Hà Tĩnh": ["Ha Tinh", "Hà Tĩnh"],
-    "Nam Định": ["Nam Dinh", "Nam Định"],
-    "Huế": ["Hue", "Huế", "Thua Thien Hue", "Thừa Thiên Huế"],
-}
-
-
 def standardize_location(location):
-    if location is None:
-        return None
-
-    for standard_location, patterns in LOCATION_MAPPING.items():
-        if any(re.search(pattern, location, re.IGNORECASE) for pattern in patterns):
-            return standard_location
-
-    return location
+    return location_normalizer.normalize(location)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.logger import logger
+from src.models import CrawlWatermark
+
+# Overlap between runs, so jobs posted while the last run was going aren't missed
+WINDOW_MARGIN = timedelta(hours=1)
+
+
+class CrawlWatermarks:
+    """Per-query high-water marks for incremental crawls.
+
+    Search results are sorted newest first, so once a page shows the newest
+    job of the previous run every later page is already stored. The start
+    time of that run also bounds how far back a date-filtered search needs
+    to look.
+    """
+
+    def __init__(self, db: Session, source: str):
+        self.db = db
+        self.source = source
+
+    def _entry(self, query: str) -> Optional[CrawlWatermark]:
+        return (
+            self.db.query(CrawlWatermark)
+            .filter_by(source=self.source, query=query)
+            .first()
+        )
+
+    def crossed(self, query: str, external_ids: Iterable[str]) -> bool:
+        entry = self._entry(query)
+        if entry is None or not entry.newest_external_id:
+            return False
+        return entry.newest_external_id in set(external_ids)
+
+    def window(self, query: str) -> Optional[timedelta]:
+        """How far back this query has to look to cover everything since its last run."""
+        entry = self._entry(query)
+        if entry is None or entry.last_run_at is None:
+            return None
+        return datetime.now() - entry.last_run_at + WINDOW_MARGIN
+
+    def advance(
+        self, query: str, newest_external_id: Optional[str], run_started_at: datetime
+    ):
+        entry = self._entry(query)
+        if entry is None:
+            entry = CrawlWatermark(source=self.source, query=query)
+            self.db.add(entry)
+        # A run without new jobs keeps the previous mark
+        if newest_external_id:
+            entry.newest_external_id = newest_external_id
+        entry.last_run_at = run_started_at
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving crawl watermark: {e}")
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from src.async_db import async_url, engine_options
+
+
+def test_async_url_swaps_the_driver():
+    assert (
+        async_url("postgresql://jobs:secret@db:5432/jobs")
+        == "postgresql+asyncpg://jobs:secret@db:5432/jobs"
+    )
+    assert async_url("sqlite:///./jobs.db") == "sqlite+aiosqlite:///./jobs.db"
+    with pytest.raises(ValueError):
+        async_url("mssql://db/jobs")
+
+
+def test_pool_is_tuned_for_postgres_only(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "4")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "2000")
+    options = engine_options("postgresql://db/jobs")
+    assert options["pool_size"] == 4 and options["pool_pre_ping"]
+    assert options["connect_args"]["server_settings"]["statement_timeout"] == "2000"
+    assert engine_options("sqlite:///./jobs.db") == {"pool_pre_ping": True}
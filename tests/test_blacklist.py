@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.blacklist import Blacklist, JobBlacklist
+from src.clean_blacklist import delete_jobs, find_blacklisted_jobs
+from src.job import Job
+from src.models import Base, Favorite, JobListing, JobSource
+
+
+def test_phrase_matches_whole_words_in_order():
+    blacklist = Blacklist(["Data Engineer", "Java"])
+    assert blacklist.find("Senior Data Engineer (Remote)") == "Data Engineer"
+    assert blacklist.find("senior data engineer") == "Data Engineer"
+    assert blacklist.find("Engineer, Data") is None
+    assert blacklist.find("JavaScript Developer") is None
+    assert blacklist.find("Java/Kotlin Developer") == "Java"
+
+
+def test_any_order_rule_needs_every_word():
+    blacklist = Blacklist([["Senior", "Java"]])
+    assert blacklist.find("Java Developer (Senior)") == "Senior Java"
+    assert blacklist.find("Senior Python Developer") is None
+    assert blacklist.find("Java Java Developer") is None
+
+
+def test_overlapping_and_punctuated_entries():
+    blacklist = Blacklist(["machine learning engineer", "learning", "C++", "Node.js"])
+    assert blacklist.find("Machine Learning Engineer") in {
+        "machine learning engineer",
+        "learning",
+    }
+    assert blacklist.find("C++ Developer") == "C++"
+    assert blacklist.find("C Developer") is None
+    assert blacklist.find("Node.js Backend") == "Node.js"
+    assert blacklist.find("Node Backend") is None
+
+
+def test_unicode_and_empty_input():
+    blacklist = Blacklist(["Tiếng Nhật"])
+    assert blacklist.find("Kỹ sư cầu nối TIẾNG NHẬT") == "Tiếng Nhật"
+    assert blacklist.find(None) is None
+    assert blacklist.find("") is None
+    assert Blacklist([]).find("anything") is None
+
+
+def test_job_blacklist_filter():
+    blacklist = JobBlacklist(["Tester"], ["ABC Corp"])
+    jobs = [
+        Job(title="QA Tester", company="Good Co"),
+        Job(title="AI Engineer", company="ABC Corp"),
+        Job(title="AI Engineer", company="Good Co"),
+    ]
+    assert blacklist.filter(jobs) == [jobs[2]]
+    assert blacklist.titles.find_all(["QA Tester", "AI Engineer"]) == ["Tester", None]
+
+
+def test_clean_blacklist_deletes_matches_but_keeps_favorites():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(JobSource(id=1, name="TopCV"))
+    jobs = [
+        ("Senior Java Developer", "Acme"),
+        ("Python Developer", "Acme"),
+        ("Python Developer", "Spam Corp"),
+        ("Java Developer", "Beta"),
+    ]
+    for job_id, (title, company) in enumerate(jobs, 1):
+        db.add(
+            JobListing(
+                id=job_id,
+                source_id=1,
+                external_id=str(job_id),
+                title=title,
+                company=company,
+                url=f"https://www.topcv.vn/{job_id}.html",
+            )
+        )
+    db.add(Favorite(job_listing_id=4))
+    db.commit()
+
+    blacklist = JobBlacklist(["Java"], ["Spam Corp"])
+    job_ids, matches = find_blacklisted_jobs(db, blacklist, batch_size=2)
+    assert sorted(job_ids) == [1, 3, 4]
+    assert matches == {"Java": 2, "Spam Corp": 1}
+    assert delete_jobs(db, job_ids, chunk_size=2) == 2
+    assert sorted(job.id for job in db.query(JobListing)) == [2, 4]
@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+import main
+from src.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self, name, fail_quit=False):
+        self.name = name
+        self.fail_quit = fail_quit
+        self.quit_calls = 0
+        self.users = 0
+
+    def quit(self):
+        self.quit_calls += 1
+        if self.fail_quit:
+            raise RuntimeError("session already gone")
+
+
+def test_map_isolates_failures_and_never_shares_a_driver():
+    drivers = [FakeDriver("a"), FakeDriver("b")]
+    pool = DriverPool(drivers)
+    lock = threading.Lock()
+
+    def task(driver, item):
+        with lock:
+            driver.users += 1
+            assert driver.users == 1
+        try:
+            if item == 3:
+                raise ValueError("page did not load")
+            return item * 10
+        finally:
+            with lock:
+                driver.users -= 1
+
+    results = dict(pool.map(task, range(6)))
+    assert results == {0: 0, 1: 10, 2: 20, 4: 40, 5: 50}
+    # The driver used by the failed task went back to the pool
+    assert pool._idle.qsize() == 2
+
+
+def test_quit_closes_every_driver_even_if_one_fails():
+    drivers = [FakeDriver("a", fail_quit=True), FakeDriver("b")]
+    DriverPool(drivers).quit()
+    assert [driver.quit_calls for driver in drivers] == [1, 1]
+
+
+def test_crawl_linkedin_quits_drivers_when_a_later_one_fails(monkeypatch):
+    started = []
+
+    def init_browser(user_data_dir="Default"):
+        if len(started) == 2:
+            raise RuntimeError("Failed to initialize chrome browser")
+        started.append(FakeDriver(user_data_dir))
+        return started[-1]
+
+    class Authenticator:
+        home_url = "https://www.linkedin.com/feed/"
+
+        def __init__(self, driver):
+            pass
+
+        def set_secrets(self, email, password):
+            pass
+
+        def start(self):
+            pass
+
+    monkeypatch.setattr(main, "init_browser", init_browser)
+    monkeypatch.setattr(main, "LinkedInAuthenticator", Authenticator)
+    with pytest.raises(RuntimeError):
+        main.crawl_linkedin(
+            {"linkedin_drivers": 3}, {"email": "", "password": ""}, db=None
+        )
+    assert [driver.quit_calls for driver in started] == [1, 1]
@@ -0,0 +1,52 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.getcwd())
+from src.expiration import (
+    ExpirationChecker,
+    ITViecExpirationChecker,
+    LinkedInExpirationChecker,
+    TopCVExpirationChecker,
+)
+
+
+def response(status_code=200, text="", url=""):
+    return SimpleNamespace(status_code=status_code, text=text, url=url)
+
+
+def test_status_codes():
+    checker = ExpirationChecker(fetcher=None)
+    row = SimpleNamespace(url="https://example.com/job/1")
+    assert checker.is_expired(row, response(404)) is True
+    assert checker.is_expired(row, response(200)) is False
+    assert checker.is_expired(row, response(403)) is None
+    assert checker.is_expired(row, None) is None
+
+
+def test_linkedin_uses_guest_posting():
+    checker = LinkedInExpirationChecker(fetcher=None)
+    row = SimpleNamespace(
+        url="https://www.linkedin.com/jobs/view/42/", external_id="42"
+    )
+    assert checker.url(row).endswith("/jobPosting/42")
+    closed = '<figcaption class="closed-job__flavor--closed">No longer accepting'
+    assert checker.is_expired(row, response(text=closed)) is True
+    assert checker.is_expired(row, response(text="<div>Apply</div>")) is False
+
+
+def test_itviec_redirect_means_expired():
+    checker = ITViecExpirationChecker(fetcher=None)
+    row = SimpleNamespace(url="https://itviec.com/it-jobs/ai-engineer-acme-1234")
+    assert checker.is_expired(row, response(url=row.url + "/")) is False
+    assert checker.is_expired(row, response(url="https://itviec.com/it-jobs")) is True
+
+
+def test_topcv_deadline():
+    checker = TopCVExpirationChecker(fetcher=None)
+    row = SimpleNamespace(url="https://www.topcv.vn/viec-lam/ai-engineer/1.html")
+    past = "<div>Hạn nộp hồ sơ: 01/02/2020</div>"
+    future = "<div>Hạn nộp hồ sơ: 01/02/2999</div>"
+    assert checker.is_expired(row, response(text=past)) is True
+    assert checker.is_expired(row, response(text=future)) is False
+    assert checker.is_expired(row, response(text="<div></div>")) is False
@@ -0,0 +1,63 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.getcwd())
+from src.fetcher import AsyncFetcher
+
+
+class FakeScraper:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def request(self, method, url, headers=None):
+        self.requests.append(url)
+        outcome = self.responses[url].pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(status_code=outcome, headers={}, text=url)
+
+
+class FakeLimiter:
+    def __init__(self):
+        self.throttled = []
+
+    async def acquire(self, url):
+        pass
+
+    def on_success(self, url):
+        pass
+
+    def on_throttle(self, url, attempt, retry_after):
+        self.throttled.append(attempt)
+
+
+def test_errors_become_none_without_failing_the_batch():
+    scraper = FakeScraper(
+        {
+            "https://topcv.vn/1": [200],
+            "https://topcv.vn/2": [ConnectionError("reset by peer")],
+            "https://itviec.com/3": [404],
+        }
+    )
+    fetcher = AsyncFetcher(scraper, limiter=FakeLimiter())
+    responses = fetcher.fetch_all(list(scraper.responses))
+    assert responses[0].status_code == 200 and responses[0].text.endswith("/1")
+    assert responses[1] is None
+    # Other errors are passed through for the caller to handle
+    assert responses[2].status_code == 404
+
+
+def test_throttled_requests_are_retried_then_given_up():
+    scraper = FakeScraper(
+        {"https://topcv.vn/1": [429, 503, 200], "https://topcv.vn/2": [429] * 3}
+    )
+    limiter = FakeLimiter()
+    fetcher = AsyncFetcher(scraper, max_retries=2, limiter=limiter)
+    first, second = fetcher.fetch_all(list(scraper.responses))
+    assert first.status_code == 200
+    # The last throttled response is returned once the retries run out
+    assert second.status_code == 429
+    assert scraper.requests.count("https://topcv.vn/2") == 3
+    assert sorted(limiter.throttled) == [0, 0, 1, 1, 2]
@@ -0,0 +1,166 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import cloudscraper
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from src.fetcher import FetchError
+from src.frontier import (
+    FAILED,
+    IN_FLIGHT,
+    MAX_ATTEMPTS,
+    MAX_CYCLE_AGE,
+    PENDING,
+    CrawlFrontier,
+)
+from src.job import Job
+from src.models import Base, CrawlFrontierEntry
+from src.topcv_job_manager import TopCVJobManager
+
+
+def new_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_resume_after_crash():
+    db = new_session()
+    frontier = CrawlFrontier(db, "TopCV")
+    frontier.start(["ai", "data"])
+    frontier.mark_done("data")
+    frontier.mark_in_flight("ai", "https://www.topcv.vn/ai?page=3")
+    frontier.mark_page_done("ai", 2)
+
+    frontier = CrawlFrontier(db, "TopCV")
+    frontier.start(["ai", "data"])
+    assert not frontier.is_done("ai")
+    assert frontier.last_page("ai", default=0) == 2
+    assert frontier.is_done("data")
+
+
+def test_reset_after_all_done():
+    db = new_session()
+    frontier = CrawlFrontier(db, "TopCV")
+    frontier.start(["ai", "data"])
+    frontier.mark_page_done("ai", 5)
+    frontier.mark_done("ai")
+    frontier.mark_done("data")
+
+    frontier.start(["ai", "data"])
+    assert not frontier.is_done("ai") and not frontier.is_done("data")
+    assert frontier.last_page("ai", default=0) == 0
+
+
+def test_queries_no_longer_configured_are_dropped():
+    db = new_session()
+    frontier = CrawlFrontier(db, "TopCV")
+    frontier.start(["old"])
+    frontier.mark_in_flight("old", "https://www.topcv.vn/old?page=4")
+    frontier.mark_page_done("old", 3)
+
+    frontier.start(["new"])
+    queries = [entry.query for entry in db.query(CrawlFrontierEntry).all()]
+    assert queries == ["new"]
+    frontier.mark_done("new")
+    frontier.start(["new", "old"])
+    assert not frontier.is_done("new")
+    assert frontier.last_page("old", default=0) == 0
+
+
+def test_failed_page_is_resumed_next_run():
+    db = new_session()
+    manager = TopCVJobManager(cloudscraper.create_scraper(), db)
+    manager.set_parameters({"positions": ["ai"]})
+    requested = []
+
+    def read_jobs(page_url, fail_on=None):
+        page = int(page_url.split("page=")[1].split("&")[0])
+        requested.append(page)
+        if page == fail_on:
+            raise FetchError(f"Error fetching {page_url}: HTTP 503")
+        link = f"https://www.topcv.vn/viec-lam/ai/{page}.html"
+        return [Job(title="AI", company="Acme", location="Hà Nội", link=link)], 3
+
+    manager.read_jobs = lambda url: read_jobs(url, fail_on=2)
+    manager.collecting_data()
+    entry = db.query(CrawlFrontierEntry).filter_by(query="ai").one()
+    assert entry.status == IN_FLIGHT and entry.last_page == 1
+
+    requested.clear()
+    manager.read_jobs = read_jobs
+    manager.collecting_data()
+    assert requested[0] == 2 and 1 not in requested
+    assert CrawlFrontier(db, "TopCV").is_done("ai")
+
+
+def test_failing_query_does_not_block_the_others():
+    db = new_session()
+    manager = TopCVJobManager(cloudscraper.create_scraper(), db)
+    manager.set_parameters({"positions": ["ai", "bad"]})
+    requested = []
+
+    def read_jobs(page_url):
+        position = page_url.split("/tim-viec-lam-")[1].split("?")[0]
+        requested.append(position)
+        if position.startswith("bad"):
+            raise FetchError(f"Error fetching {page_url}: HTTP 503")
+        link = f"https://www.topcv.vn/viec-lam/{position}/{len(requested)}.html"
+        return [Job(title="AI", company="Acme", location="Hà Nội", link=link)], 1
+
+    manager.read_jobs = read_jobs
+    for _ in range(MAX_ATTEMPTS):
+        requested.clear()
+        manager.collecting_data()
+    assert all(position.startswith("bad") for position in requested)
+    entry = db.query(CrawlFrontierEntry).filter_by(query="bad").one()
+    assert entry.status == FAILED and entry.attempts == MAX_ATTEMPTS
+
+    # Every query is finished now, so the next run is a fresh cycle
+    requested.clear()
+    manager.collecting_data()
+    assert any(position.startswith("ai") for position in requested)
+
+
+def test_old_cycle_starts_fresh():
+    db = new_session()
+    frontier = CrawlFrontier(db, "TopCV")
+    frontier.start(["ai", "data"])
+    frontier.mark_done("ai")
+    frontier.mark_failed("data")
+    for entry in db.query(CrawlFrontierEntry).all():
+        entry.cycle_started_at = datetime.now() - MAX_CYCLE_AGE - timedelta(hours=1)
+    db.commit()
+
+    frontier.start(["ai", "data"])
+    assert not frontier.is_done("ai")
+    entry = db.query(CrawlFrontierEntry).filter_by(query="data").one()
+    assert entry.status == PENDING and entry.attempts == 0
+
+
+def test_out_of_order_first_page_does_not_stop_the_crawl():
+    db = new_session()
+    manager = TopCVJobManager(cloudscraper.create_scraper(), db)
+    manager.set_parameters({"positions": ["ai"], "incremental": True})
+    pinned = Job(
+        title="AI", company="Acme", location="Hà Nội", link="https://x/pinned.html"
+    )
+    manager.read_jobs = lambda url: ([pinned], 1)
+    manager.collecting_data()
+
+    # The stored job is pinned at the top, newer jobs come after it
+    pages = {
+        1: [pinned],
+        2: [
+            Job(
+                title="AI", company="Beta", location="Hà Nội", link="https://x/new.html"
+            )
+        ],
+    }
+    manager.read_jobs = lambda url: (pages.get(int(url.split("page=")[1][0]), []), 2)
+    assert manager.collecting_data() == 1
+    assert CrawlFrontier(db, "TopCV").is_done("ai")
@@ -0,0 +1,37 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.getcwd())
+from src.http_cache import HttpCache
+
+
+def page(text):
+    return SimpleNamespace(text=text, headers={"ETag": '"v1"'})
+
+
+def test_missing_body_is_a_miss(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    cache.store("https://example.com/a", page("<html>a</html>"))
+    entry = cache.lookup("https://example.com/a")
+    assert cache.response(entry).text == "<html>a</html>"
+
+    # Another instance evicted the body after this one read the entry
+    cache._body_path(entry["digest"]).unlink()
+    assert cache.response(entry) is None
+    assert cache.revalidated(entry) is None
+    assert cache.get_cached("https://example.com/a") is None
+
+
+def test_evict_keeps_fresh_orphan_bodies(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=0)
+    cache.store("https://example.com/a", page("<html>a</html>"))
+    digest = cache.lookup("https://example.com/a")["digest"]
+    # A body written by a store() whose entry isn't there yet
+    orphan_digest = "0" * 64
+    cache._body_path(orphan_digest).write_bytes(b"")
+
+    cache.evict()
+    assert cache.lookup("https://example.com/a") is None
+    assert not cache._body_path(digest).exists()
+    assert cache._body_path(orphan_digest).exists()
@@ -0,0 +1,45 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.job import Job
+from src.job_index import KnownJobIndex
+from src.models import Base, JobListing, JobSource
+
+
+def job(external_id):
+    return Job(
+        title="AI Engineer",
+        company="Acme",
+        location="Hà Nội",
+        link=f"https://www.topcv.vn/viec-lam/ai/{external_id}.html",
+    )
+
+
+def test_index_is_loaded_per_source_and_filters_new_jobs():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    topcv, itviec = JobSource(id=1, name="TopCV"), JobSource(id=2, name="ITViec")
+    db.add_all([topcv, itviec])
+    for source_id, external_id in [(1, "1"), (1, "2"), (2, "3")]:
+        db.add(
+            JobListing(
+                source_id=source_id,
+                external_id=external_id,
+                url=f"https://example.com/{source_id}/{external_id}",
+            )
+        )
+    db.commit()
+
+    known = KnownJobIndex.load(db, topcv)
+    assert len(known) == 2 and "1" in known and "3" not in known
+    get_job_id = lambda job: job.link.split("/")[-1].split(".html")[0]
+    new_jobs = known.new_jobs([job("1"), job("3"), job("4")], get_job_id)
+    assert [get_job_id(job) for job in new_jobs] == ["3", "4"]
+    known.add(["3"])
+    assert [get_job_id(job) for job in known.new_jobs(new_jobs, get_job_id)] == ["4"]
@@ -1,5 +1,6 @@
 import os
 import sys
+from datetime import timedelta
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
@@ -32,3 +33,15 @@ def test_get_job_description():
     description = job_manager._get_job_description(job)
     print(description)
     assert description != "", "Error"
+
+
+def test_incremental_search_url_narrows_date_filter():
+    job_manager = JobManager(None)
+    job_manager.set_parameters({"date": {"week": True}})
+    assert job_manager.incremental_search_url(None) == "?sortBy=DD&f_TPR=r604800"
+    window = timedelta(hours=25)
+    assert job_manager.incremental_search_url(window) == "?sortBy=DD&f_TPR=r90000"
+    assert (
+        job_manager.incremental_search_url(timedelta(days=30))
+        == "?sortBy=DD&f_TPR=r604800"
+    )
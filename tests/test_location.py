@@ -0,0 +1,86 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.location import LocationNormalizer, fold
+from src.models import Base, JobListing, JobSource
+from src.normalize_locations import apply_location_updates, plan_location_updates
+from src.utils import standardize_location
+
+
+def test_fold():
+    assert fold("Đà Nẵng") == "da nang"
+    assert fold("Thừa Thiên Huế") == "thua thien hue"
+
+
+def test_normalize_ignores_case_accents_and_separators():
+    normalizer = LocationNormalizer()
+    assert normalizer.normalize("Ha Noi, Vietnam") == "Hà Nội"
+    assert normalizer.normalize("HANOI") == "Hà Nội"
+    assert normalizer.normalize("TP. Hồ Chí Minh") == "Hồ Chí Minh"
+    assert normalizer.normalize("Ho-Chi-Minh City") == "Hồ Chí Minh"
+    assert normalizer.normalize("Thu Duc City") == "Hồ Chí Minh"
+    assert normalizer.normalize("Da Nang") == "Đà Nẵng"
+    assert normalizer.normalize("Quang Ngai") == "Quãng Ngãi"
+    assert normalizer.normalize("Thua Thien Hue") == "Huế"
+    assert normalizer.normalize("Ba Ria - Vung Tau") == "Vũng Tàu"
+
+
+def test_normalize_keeps_unknown_locations():
+    normalizer = LocationNormalizer()
+    assert normalizer.normalize("Singapore") == "Singapore"
+    assert normalizer.normalize("Thuế") == "Thuế"
+    assert normalizer.normalize("Longan Street") == "Longan Street"
+    assert normalizer.normalize(None) is None
+
+
+def test_multi_city_and_batch():
+    normalizer = LocationNormalizer()
+    assert normalizer.normalize_all("Ha Noi, Ho Chi Minh & 1 nơi khác") == [
+        "Hà Nội",
+        "Hồ Chí Minh",
+    ]
+    assert normalizer.normalize_all("Vĩnh Long, Trà Vinh") == ["Vĩnh Long", "Trà Vinh"]
+    assert normalizer.normalize_many(["Hanoi", "Can Tho", None]) == [
+        "Hà Nội",
+        "Cần Thơ",
+        None,
+    ]
+
+
+def test_results_are_cached():
+    normalizer = LocationNormalizer(cache_size=2)
+    for _ in range(3):
+        normalizer.normalize("Ha Noi, Vietnam")
+    assert normalizer.cache_info().hits == 2
+    assert standardize_location("Hà Nội") == "Hà Nội"
+
+
+def test_backfill_rewrites_each_distinct_location_once():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(JobSource(id=1, name="TopCV"))
+    raw = ["Ha Noi", "HANOI", "Ha Noi", "Hà Nội", "Singapore", None]
+    for job_id, location in enumerate(raw):
+        db.add(
+            JobListing(
+                source_id=1,
+                external_id=str(job_id),
+                location=location,
+                url=f"https://www.topcv.vn/{job_id}.html",
+            )
+        )
+    db.commit()
+
+    updates = plan_location_updates(db)
+    assert {key: sorted(value) for key, value in updates.items()} == {
+        "Hà Nội": ["HANOI", "Ha Noi"]
+    }
+    assert apply_location_updates(db, updates, chunk_size=1) == 3
+    locations = [job.location for job in db.query(JobListing).order_by(JobListing.id)]
+    assert locations == ["Hà Nội"] * 4 + ["Singapore", None]
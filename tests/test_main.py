@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+import main
+
+
+def test_a_failing_source_does_not_stop_the_others(monkeypatch):
+    def crawl_linkedin(parameters, secrets, db):
+        raise RuntimeError("Failed to initialize chrome browser")
+
+    crawlers = {
+        "LinkedIn": crawl_linkedin,
+        "ITViec": lambda parameters, secrets, db: 3,
+        "TopCV": lambda parameters, secrets, db: None,
+    }
+    monkeypatch.setattr(main, "SOURCE_CRAWLERS", crawlers)
+    monkeypatch.setattr(
+        main.ConfigValidator,
+        "validate_config",
+        lambda path: {"job_sources": ["LinkedIn", "ITViec", "TopCV"]},
+    )
+    monkeypatch.setattr(main.ConfigValidator, "validate_secrets", lambda path: {})
+
+    results = {result["source"]: result for result in main.run_job_crawler()}
+    assert results["LinkedIn"]["status"] == "failed"
+    assert "chrome" in results["LinkedIn"]["error"]
+    assert results["ITViec"]["status"] == "ok" and results["ITViec"]["new_jobs"] == 3
+    assert results["TopCV"]["status"] == "ok" and results["TopCV"]["new_jobs"] == 0
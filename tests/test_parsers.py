@@ -0,0 +1,51 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.getcwd())
+from src.job import Job
+from src.parsers import Bs4Parser, LxmlParser
+
+FIXTURES = Path(__file__).parents[1] / "benchmarks" / "fixtures"
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_itviec_job_list_matches_bs4():
+    page_html = read_fixture("itviec_listing.html")
+    expected = Bs4Parser().itviec_job_list(page_html)
+    assert LxmlParser().itviec_job_list(page_html) == expected
+    assert len(expected[0]) == 20
+
+
+def test_itviec_job_description_matches_bs4():
+    page_html = read_fixture("itviec_detail.html")
+    expected = Bs4Parser().itviec_job_description(page_html)
+    assert LxmlParser().itviec_job_description(page_html) == expected
+    assert expected
+
+
+def test_topcv_job_list_matches_bs4():
+    page_html = read_fixture("topcv_listing.html")
+    expected = Bs4Parser().topcv_job_list(page_html)
+    assert LxmlParser().topcv_job_list(page_html) == expected
+    assert expected[1] == 14
+
+
+def test_topcv_job_detail_matches_bs4():
+    page_html = read_fixture("topcv_detail.html")
+    expected, actual = Job(), Job()
+    Bs4Parser().topcv_job_detail(expected, page_html)
+    LxmlParser().topcv_job_detail(actual, page_html)
+    assert actual == expected
+    assert expected.location == "Hà Nội"
+
+
+def test_linkedin_job_description_matches_bs4():
+    page_html = read_fixture("linkedin_job_posting.html")
+    expected = Bs4Parser().linkedin_job_description(page_html)
+    assert LxmlParser().linkedin_job_description(page_html) == expected
+    assert len(expected) > 500
+    assert Bs4Parser().linkedin_job_description("<div>Sign in</div>") is None
@@ -0,0 +1,91 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from src.job import Job
+from src.models import Base, DataVersion, JobListing, JobSource
+from src.persistence import (
+    _insert_ignore_conflicts,
+    bulk_insert_jobs,
+    bump_data_version,
+    get_data_version,
+    job_to_row,
+)
+
+
+def new_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(JobSource(id=1, name="TopCV"))
+    db.commit()
+    return db
+
+
+def row(number, url=None):
+    job = Job(
+        title="AI Engineer",
+        company="Acme",
+        location="Hà Nội",
+        link=url or f"https://www.topcv.vn/viec-lam/ai/{number}.html",
+    )
+    return job_to_row(job, 1, str(number))
+
+
+def test_data_version_is_seeded_and_bumped():
+    db = new_session()
+    assert db.get(DataVersion, 1).version == 0
+    bump_data_version(db)
+    bump_data_version(db)
+    db.commit()
+    assert get_data_version(db) == 2
+
+
+def test_bump_creates_a_missing_row():
+    db = new_session()
+    # Databases created before the row was seeded
+    db.execute(delete(DataVersion))
+    db.commit()
+    bump_data_version(db)
+    bump_data_version(db)
+    db.commit()
+    assert get_data_version(db) == 2
+
+
+def test_bulk_insert_skips_duplicates_within_and_across_chunks():
+    db = new_session()
+    rows = [row(1), row(2), row(1), row(3, url=row(2)["url"])]
+    assert bulk_insert_jobs(db, rows, chunk_size=2) == (2, 2)
+    # Stored rows are skipped on the next run
+    assert bulk_insert_jobs(db, [row(2), row(4)]) == (1, 1)
+    assert db.query(JobListing).count() == 3
+    assert get_data_version(db) == 2
+
+
+def test_bulk_insert_splits_chunks_at_the_sqlite_parameter_cap():
+    db = new_session()
+    # 9 columns per row, so only 100 rows fit in one SQLite statement
+    rows = [row(number) for number in range(250)]
+    assert bulk_insert_jobs(db, rows, chunk_size=500) == (250, 0)
+    assert db.query(JobListing).count() == 250
+    assert get_data_version(db) == 3
+
+
+def test_bulk_insert_ignores_rows_without_keys():
+    db = new_session()
+    rows = [row(1), {**row(2), "external_id": ""}, {**row(3), "url": None}]
+    assert bulk_insert_jobs(db, rows) == (1, 0)
+    assert bulk_insert_jobs(db, []) == (0, 0)
+    assert get_data_version(db) == 1
+
+
+def test_generic_insert_skips_stored_and_repeated_rows():
+    db = new_session()
+    bulk_insert_jobs(db, [row(1)])
+    assert _insert_ignore_conflicts(db, "mysql", [row(1), row(2), row(2)]) == 1
+    db.commit()
+    assert db.query(JobListing).count() == 2
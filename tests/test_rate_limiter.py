@@ -0,0 +1,50 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+sys.path.insert(0, os.getcwd())
+from src.rate_limiter import RateLimiter, TokenBucket, domain_key, parse_retry_after
+
+
+def test_domain_key():
+    assert domain_key("https://www.topcv.vn/viec-lam/abc.html") == "topcv.vn"
+    assert domain_key("https://itviec.com/it-jobs/ai?page=2") == "itviec.com"
+    assert domain_key("https://www.linkedin.com/jobs/view/1/") == "linkedin.com"
+    assert domain_key("https://example.org:8080/x") == "example.org"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("30") == 30.0
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+    assert 55 <= delay <= 60
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=10.0, min_rate=1.0, max_rate=20.0)
+    assert bucket.reserve() < 0.05
+    # The bucket is empty now, so the next token is ~1/rate away
+    assert 0.05 < bucket.reserve() < 0.15
+
+
+def test_token_bucket_adapts_to_throttling():
+    bucket = TokenBucket(rate=1.0, min_rate=0.1, max_rate=2.0, increase=0.5)
+    bucket.on_throttle(5.0)
+    assert bucket.rate == 0.5
+    assert bucket.reserve() >= 4.9
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.rate == 2.0
+
+
+def test_rate_limiter_shares_bucket_per_domain():
+    limiter = RateLimiter()
+    assert limiter.bucket("https://www.topcv.vn/a") is limiter.bucket(
+        "https://topcv.vn/b"
+    )
+    assert limiter.bucket("https://itviec.com/a") is not limiter.bucket(
+        "https://topcv.vn/a"
+    )
@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base, JobListing, JobSource
+from src.persistence import bump_data_version
+from src.search import InvertedIndex, LocalSearchBackend, search_tokens
+
+
+def build_index():
+    index = InvertedIndex()
+    index.add(
+        1,
+        {"title": "AI Engineer", "company": "Acme", "description": "Python, LLM"},
+        source="ITViec",
+        location="Hà Nội",
+    )
+    index.add(
+        2,
+        {"title": "Data Engineer", "company": "Beta", "description": "Spark, Python"},
+        source="TopCV",
+        location="Hồ Chí Minh",
+    )
+    index.add(
+        3,
+        {"title": "Kỹ sư AI", "company": "Gamma", "description": "Nghiên cứu AI, AI"},
+        source="TopCV",
+        location="Hà Nội",
+    )
+    return index
+
+
+def test_search_tokens_fold_accents():
+    assert search_tokens("Kỹ sư Đà Nẵng") == ["ky", "su", "da", "nang"]
+    assert search_tokens(None) == []
+
+
+def test_bm25_ranks_title_matches_first():
+    index = build_index()
+    total, ids = index.search("python engineer")
+    assert total == 2
+    assert set(ids) == {1, 2}
+    total, ids = index.search("ai")
+    assert ids == [3, 1]
+    assert index.search("ky su")[1] == [3]
+    assert index.search("rust") == (0, [])
+
+
+def test_filters_and_pagination():
+    index = build_index()
+    assert index.search("engineer", source="TopCV")[1] == [2]
+    assert index.search("ai", locations=["Hà Nội"])[1] == [3, 1]
+    assert index.search("ai", locations=["Hồ Chí Minh"]) == (0, [])
+    total, ids = index.search("ai", offset=1, limit=1)
+    assert (total, ids) == (2, [1])
+
+
+def test_cursor_continues_after_the_last_ranked_id():
+    index = build_index()
+    assert index.search("ai python", limit=1)[1] == [1]
+    # Ids aren't in ranking order, so the cursor can't be an id bound
+    assert index.search("ai python", limit=2, after_id=1)[1] == [3, 2]
+    assert index.search("ai python", limit=2, after_id=2)[1] == []
+    # A cursor whose job is gone falls back to the offset
+    index.remove(3)
+    assert index.search("ai python", offset=1, limit=1, after_id=3)[1] == [2]
+
+
+def test_reindexing_a_document_replaces_it():
+    index = build_index()
+    index.add(2, {"title": "Backend Developer"}, source="TopCV")
+    assert index.search("spark") == (0, [])
+    assert index.search("backend")[1] == [2]
+    index.remove(2)
+    assert len(index) == 2
+    assert "backend" not in index.postings
+
+
+def test_local_backend_follows_deletes_and_edits():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    db.add(JobSource(id=1, name="TopCV"))
+    for job_id, location in [(1, "Hà Nội"), (2, "Hà Nội"), (3, "Hồ Chí Minh")]:
+        db.add(
+            JobListing(
+                id=job_id,
+                source_id=1,
+                external_id=str(job_id),
+                title="Python Engineer",
+                location=location,
+                url=f"https://www.topcv.vn/{job_id}.html",
+            )
+        )
+    bump_data_version(db)
+    db.commit()
+
+    backend = LocalSearchBackend(session_factory, refresh_interval=0)
+    assert backend.search("python", None, ["Hà Nội"], 1, 10).ids == [2, 1]
+
+    db.execute(delete(JobListing).where(JobListing.id == 2))
+    bump_data_version(db)
+    db.commit()
+    hits = backend.search("python", None, None, 1, 10)
+    assert hits.total == 2 and set(hits.ids) == {1, 3}
+
+    # An edit to an old row shows up with the next full rebuild
+    db.execute(update(JobListing).where(JobListing.id == 3).values(location="Hà Nội"))
+    bump_data_version(db)
+    db.commit()
+    backend.rebuild_interval = 0
+    assert set(backend.search("python", None, ["Hà Nội"], 1, 10).ids) == {1, 3}
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault("DB_URL", "sqlite://")
+os.environ.setdefault("SEARCH_BACKEND", "local")
+os.environ.setdefault("TRANSLATION_MODEL", "stub")
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+import server
+from src.models import Base, DataVersion, Favorite, JobListing, JobSource
+from src.persistence import bump_data_version
+
+
+def request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def new_databases(tmp_path):
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(JobSource(id=1, name="TopCV"))
+    for job_id in range(1, 4):
+        db.add(
+            JobListing(
+                id=job_id,
+                source_id=1,
+                external_id=str(job_id),
+                url=f"https://www.topcv.vn/{job_id}.html",
+            )
+        )
+    db.commit()
+    async_engine = create_async_engine(url.replace("sqlite", "sqlite+aiosqlite"))
+    return db, async_sessionmaker(async_engine)
+
+
+def test_etag_revalidation_follows_the_data_version(tmp_path):
+    db, async_session = new_databases(tmp_path)
+    server.response_cache.clear()
+    server.data_version_cache.clear()
+
+    async def get(etag=None):
+        async with async_session() as async_db:
+            return await server.read_job_sources(request(etag), async_db)
+
+    first = asyncio.run(get())
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and b"TopCV" in first.body
+    unchanged = asyncio.run(get(etag))
+    assert unchanged.status_code == 304 and unchanged.headers["etag"] == etag
+
+    # A crawl commits a new source and bumps the version
+    db.add(JobSource(id=2, name="ITViec"))
+    bump_data_version(db)
+    db.commit()
+    server.data_version_cache.clear()
+    changed = asyncio.run(get(etag))
+    assert changed.status_code == 200 and b"ITViec" in changed.body
+    assert changed.headers["etag"] != etag
+
+
+def test_favorite_counts_follow_saves_from_other_workers(tmp_path):
+    db, async_session = new_databases(tmp_path)
+    server.favorite_count_cache.clear()
+    server.data_version_cache.clear()
+
+    async def favorites_total():
+        async with async_session() as async_db:
+            response = await server.read_jobs(
+                request(), favorites=True, locations=None, db=async_db
+            )
+            return response.total
+
+    async def save(job_id):
+        async with async_session() as async_db:
+            favorite = server.FavoriteSchema(job_listing_id=job_id)
+            await server.create_favorite(favorite, async_db)
+
+    assert asyncio.run(favorites_total()) == 0
+    asyncio.run(save(1))
+    assert asyncio.run(favorites_total()) == 1
+
+    # Another worker saves a favorite; this one only sees the shared version
+    db.add(Favorite(job_listing_id=2))
+    db.execute(
+        update(DataVersion).values(favorites_version=DataVersion.favorites_version + 1)
+    )
+    db.commit()
+    server.data_version_cache.clear()
+    assert asyncio.run(favorites_total()) == 2
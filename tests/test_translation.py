@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.getcwd())
+from src.translation import (
+    MemoryTranslationStore,
+    StubModel,
+    Translator,
+    build_batch_prompt,
+    content_hash,
+    split_batch_response,
+)
+
+
+def test_content_hash_ignores_whitespace():
+    assert content_hash("Python  developer\n") == content_hash("Python developer")
+    assert content_hash("Python developer") != content_hash("Java developer")
+
+
+def test_split_batch_response():
+    prompt = build_batch_prompt(["one", "two"])
+    assert "<<<1>>>\none" in prompt and "<<<2>>>\ntwo" in prompt
+    assert split_batch_response("<<<1>>>\nmột\n\n<<<2>>>\nhai\n", 2) == ["một", "hai"]
+    assert split_batch_response("<<<1>>>\nmột", 2) is None
+
+
+def test_concurrent_requests_share_one_call():
+    model = StubModel(delay=0.05)
+    translator = Translator(model, MemoryTranslationStore())
+
+    async def run():
+        return await asyncio.gather(*[translator.translate("Hello") for _ in range(5)])
+
+    assert asyncio.run(run()) == ["[vi] Hello"] * 5
+    assert model.calls == 1
+
+
+def test_cache_is_shared_across_listings():
+    model = StubModel()
+    store = MemoryTranslationStore()
+    asyncio.run(Translator(model, store).translate("Senior AI Engineer"))
+    # A fresh translator, e.g. another worker, reuses the stored translation
+    translated = asyncio.run(Translator(model, store).translate("Senior  AI Engineer"))
+    assert translated == "[vi] Senior AI Engineer"
+    assert model.calls == 1
+
+
+def test_translate_many_dedupes_and_batches():
+    model = StubModel()
+    translator = Translator(model, MemoryTranslationStore(), batch_size=2)
+    asyncio.run(translator.translate("a"))
+    texts = ["a", "b", "c", "b", "d"]
+    assert asyncio.run(translator.translate_many(texts)) == [
+        "[vi] a",
+        "[vi] b",
+        "[vi] c",
+        "[vi] b",
+        "[vi] d",
+    ]
+    # One call for "a", then b, c, d in two batches
+    assert model.calls == 3
+
+
+def test_translate_stream_yields_chunks_then_caches():
+    model = StubModel()
+    translator = Translator(model, MemoryTranslationStore())
+
+    async def collect():
+        return [chunk async for chunk in translator.translate_stream("Hello world")]
+
+    assert asyncio.run(collect()) == ["[vi] ", "Hello ", "world"]
+    # A cache hit comes back whole, without calling the model again
+    assert asyncio.run(collect()) == ["[vi] Hello world"]
+    assert model.calls == 1
+
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    model = StubModel(delay=0.2)
+    translator = Translator(model, MemoryTranslationStore())
+
+    async def run():
+        leader = asyncio.ensure_future(translator.translate("Hello"))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(translator.translate("Hello")) for _ in "ab"]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+
+    assert asyncio.run(run()) == ["[vi] Hello"] * 2
+    # The cancelled call, then one call by the waiter that took over
+    assert model.calls == 2
+    assert not translator._in_flight
+
+
+def test_disconnected_stream_hands_over_to_a_waiter():
+    model = StubModel(delay=0.05)
+    translator = Translator(model, MemoryTranslationStore())
+
+    async def run():
+        stream = translator.translate_stream("Hello big world")
+        await stream.__anext__()
+        waiter = asyncio.ensure_future(translator.translate("Hello big world"))
+        await asyncio.sleep(0.01)
+        # What the server sees when an SSE client goes away
+        await stream.aclose()
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert asyncio.run(run()) == "[vi] Hello big world"
+    assert not translator._in_flight